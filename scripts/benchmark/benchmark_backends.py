@@ -0,0 +1,92 @@
+# Compare the AUC and wall time of the model backends on one data set
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from xlranker.config import config
+from xlranker.lib import XLDataSet
+from xlranker.ml.backends import BACKENDS
+from xlranker.ml.models import ModelConfig, PrioritizationModel
+from xlranker.parsimony import ParsimonySelector
+from xlranker.util import set_seed
+
+parser = argparse.ArgumentParser(
+    description="Compare the AUC and wall time of the model backends"
+)
+parser.add_argument("network", help="peptide pair network file")
+parser.add_argument("omics", help="folder with the omics data")
+parser.add_argument("--mapping", default=None, help="custom mapping table")
+parser.add_argument("--fasta", default=None, help="FASTA file used for mapping")
+parser.add_argument("--runs", type=int, default=10)
+parser.add_argument("--folds", type=int, default=5)
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument(
+    "--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS)
+)
+parser.add_argument(
+    "--fit-rows",
+    type=int,
+    default=None,
+    help="also time a single fit on a training set of this many pairs",
+)
+args = parser.parse_args()
+
+set_seed(args.seed)
+data_set = XLDataSet.load_from_network(
+    args.network,
+    args.omics,
+    custom_mapping_path=args.mapping or args.fasta,
+    is_fasta=args.mapping is None,
+)
+data_set.build_proteins()
+ParsimonySelector(data_set).run()
+
+config.output = tempfile.mkdtemp()
+model = PrioritizationModel(data_set)
+reference = None
+results = []
+for backend in args.backends:
+    set_seed(args.seed)  # same negatives and folds for every backend
+    model.model_config = ModelConfig(runs=args.runs, folds=args.folds, backend=backend)
+    start = time.perf_counter()
+    model.run_model()
+    seconds = time.perf_counter() - start
+    scores = np.array([pair.score for pair in model.to_predict])
+    if reference is None:
+        reference = scores
+    correlation = np.corrcoef(reference, scores)[0, 1]
+    results.append(
+        (backend, np.mean(model.aucs), np.std(model.aucs), seconds, correlation)
+    )
+
+print()
+print(f"{'backend':<24}{'AUC':>8}{'± std':>8}{'seconds':>10}{'r vs first':>12}")
+for backend, auc, std, seconds, correlation in results:
+    print(f"{backend:<24}{auc:>8.4f}{std:>8.4f}{seconds:>10.2f}{correlation:>12.3f}")
+
+if args.fit_rows is not None:
+    # half positives drawn with replacement, half newly sampled negatives
+    rng = np.random.default_rng(args.seed)
+    n_positives = args.fit_rows // 2
+    positive_rows = rng.choice(len(model.positives), size=n_positives)
+    X = np.concatenate(
+        [
+            model.positive_X[positive_rows],
+            model.feature_builder.build(
+                *model.sample_negative_indices(args.fit_rows - n_positives, rng)
+            ),
+        ]
+    )
+    y = np.concatenate([np.ones(n_positives), np.zeros(len(X) - n_positives)])
+    print()
+    print(f"Single fit on {len(X)} pairs")
+    print(f"{'backend':<24}{'seconds':>10}")
+    for backend in args.backends:
+        fit_backend = ModelConfig(backend=backend).create_backend()
+        fit_backend.start_run(X, y)
+        start = time.perf_counter()
+        fit_backend.fit(None, args.seed)
+        print(f"{backend:<24}{time.perf_counter() - start:>10.2f}")
@@ -2,6 +2,8 @@ import glob
 import gzip
 import pickle
 
+from xlranker.data import write_gene_set_db
+
 gmts = glob.glob("gmts/*.gmt")
 
 gmt_lists: list[list[set[str]]] = []
@@ -17,3 +19,6 @@ for gmt in gmts:
 
 with gzip.open("gmt.pkl.gz", "wb") as w:
     pickle.dump(gmt_lists, w)
+
+# compact format loaded by xlranker.data.load_gene_set_index
+write_gene_set_db(gmt_lists)
@@ -2,6 +2,8 @@
 
 import polars as pl
 
+from xlranker.data import write_ppi_db
+
 input_file = "ppi.tsv"
 
 df = pl.read_csv(
@@ -36,3 +38,6 @@ df = df.with_columns(
 
 print(df.head())
 df.write_parquet("ppi.parquet")
+
+# integer-encoded version loaded by xlranker.data.load_default_ppi_index
+write_ppi_db(df)
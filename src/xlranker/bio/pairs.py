@@ -25,6 +25,13 @@ class GroupedEntity:
     def set_subgroup(self, subgroup_id: int) -> None:
         self.subgroup_id = subgroup_id
 
+    def clear_group(self) -> None:
+        """Remove the entity from its group and reset its prioritization."""
+        self.in_group = False
+        self.group_id = -1
+        self.subgroup_id = 0
+        self.prioritization_status = PrioritizationStatus.NOT_ANALYZED
+
     def get_group_string(self) -> str:
         return f"{self.group_id}.{self.subgroup_id}"
 
@@ -57,7 +64,11 @@ class GroupedEntity:
 
 
 class ProteinPair(GroupedEntity):
-    """ProteinPair class that tracks the required data for the pipeline"""
+    """ProteinPair class that tracks the required data for the pipeline
+
+    Status changes, including direct assignments to `prioritization_status` and
+    `report_status`, are passed on to the `PairRegistry` the pair belongs to.
+    """
 
     a: Protein
     b: Protein
@@ -65,7 +76,8 @@ class ProteinPair(GroupedEntity):
     is_selected: bool
     pair_id: str
     is_intra: bool
-    report_status: ReportStatus
+    registry: "PairRegistry | None" = None
+    ordinal: int = -1
 
     def __init__(self, protein_a: Protein, protein_b: Protein) -> None:
         """Initialize a ProteinPair object, making sure a is the higher abundant protein. Input order does not matter.
@@ -85,6 +97,26 @@ class ProteinPair(GroupedEntity):
         self.is_intra = a == b
         self.report_status = ReportStatus.NONE
 
+    @property
+    def prioritization_status(self) -> PrioritizationStatus:
+        return self._prioritization_status
+
+    @prioritization_status.setter
+    def prioritization_status(self, status: PrioritizationStatus) -> None:
+        if self.registry is not None:
+            self.registry.update_status(self, self._prioritization_status, status)
+        self._prioritization_status = status
+
+    @property
+    def report_status(self) -> ReportStatus:
+        return self._report_status
+
+    @report_status.setter
+    def report_status(self, status: ReportStatus) -> None:
+        if self.registry is not None:
+            self.registry.update_report(self, self._report_status, status)
+        self._report_status = status
+
     def set_score(self, score: float) -> None:
         """Set the score of the protein pair.
 
@@ -103,6 +135,13 @@ class ProteinPair(GroupedEntity):
         """
         self.report_status = status
 
+    def clear_group(self) -> None:
+        """Remove the pair from its group and reset its status, score, and report status."""
+        super().clear_group()
+        self.score = -1
+        self.is_selected = False
+        self.report_status = ReportStatus.NONE
+
     def select(self):
         """Set this pair to be selected"""
         self.is_selected = True
@@ -154,6 +193,111 @@ class ProteinPair(GroupedEntity):
         return hash(self.pair_id)
 
 
+class PairRegistry:
+    """Index of protein pairs by prioritization status and report status.
+
+    Pairs added to the registry report their status changes to it, so the pairs with
+    a status are found in time proportional to their number. Every pair gets an
+    increasing ordinal when added, and pairs are returned in the order they were added.
+
+    Attributes:
+        by_status (dict[PrioritizationStatus, dict[int, ProteinPair]]): pairs with each prioritization status, keyed by ordinal
+        by_report (dict[ReportStatus, dict[int, ProteinPair]]): pairs with each report status, keyed by ordinal
+
+    """
+
+    by_status: dict[PrioritizationStatus, dict[int, ProteinPair]]
+    by_report: dict[ReportStatus, dict[int, ProteinPair]]
+
+    def __init__(self) -> None:
+        self.by_status = {status: {} for status in PrioritizationStatus}
+        self.by_report = {status: {} for status in ReportStatus}
+        self.next_ordinal = 0
+
+    def __len__(self) -> int:
+        return sum(len(pairs) for pairs in self.by_status.values())
+
+    def add(self, pair: ProteinPair) -> None:
+        """Add a pair to the registry.
+
+        Args:
+            pair (ProteinPair): pair not in any registry
+
+        Raises:
+            ValueError: Raised if the pair is already in a registry
+
+        """
+        if pair.registry is not None:
+            raise ValueError(f"Protein pair {pair.pair_id} is already in a registry")
+        pair.registry = self
+        pair.ordinal = self.next_ordinal
+        self.next_ordinal += 1
+        self.by_status[pair.prioritization_status][pair.ordinal] = pair
+        self.by_report[pair.report_status][pair.ordinal] = pair
+
+    def remove(self, pair: ProteinPair) -> None:
+        """Remove a pair from the registry.
+
+        Args:
+            pair (ProteinPair): pair in this registry
+
+        """
+        del self.by_status[pair.prioritization_status][pair.ordinal]
+        del self.by_report[pair.report_status][pair.ordinal]
+        pair.registry = None
+        pair.ordinal = -1
+
+    def update_status(
+        self,
+        pair: ProteinPair,
+        old: PrioritizationStatus,
+        new: PrioritizationStatus,
+    ) -> None:
+        if old is not new:
+            del self.by_status[old][pair.ordinal]
+            self.by_status[new][pair.ordinal] = pair
+
+    def update_report(
+        self, pair: ProteinPair, old: ReportStatus, new: ReportStatus
+    ) -> None:
+        if old is not new:
+            del self.by_report[old][pair.ordinal]
+            self.by_report[new][pair.ordinal] = pair
+
+    def with_status(self, *statuses: PrioritizationStatus) -> list[ProteinPair]:
+        """Get the pairs with any of the prioritization statuses.
+
+        Args:
+            *statuses (PrioritizationStatus): statuses to look up
+
+        Returns:
+            list[ProteinPair]: pairs in the order they were added
+
+        """
+        return self.ordered([self.by_status[status] for status in statuses])
+
+    def with_report_status_at_most(self, status: ReportStatus) -> list[ProteinPair]:
+        """Get the pairs whose report status is at most `status`.
+
+        Like comparing `pair.report_status <= status`, so pairs without a report status are included.
+
+        Args:
+            status (ReportStatus): least confident report status to include
+
+        Returns:
+            list[ProteinPair]: pairs in the order they were added
+
+        """
+        return self.ordered(
+            [pairs for report, pairs in self.by_report.items() if report <= status]
+        )
+
+    @staticmethod
+    def ordered(groups: list[dict[int, ProteinPair]]) -> list[ProteinPair]:
+        merged = {ordinal: pair for group in groups for ordinal, pair in group.items()}
+        return [merged[ordinal] for ordinal in sorted(merged)]
+
+
 class PeptidePair(GroupedEntity):
     """Peptide group that can contain multiple ProteinPairs and PeptidePairs."""
 
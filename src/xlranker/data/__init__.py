@@ -3,14 +3,39 @@ import lzma
 import pickle
 import tarfile
 import tempfile
+from functools import cache
 from importlib.resources import files
+from pathlib import Path
 
+import numpy as np
 import polars as pl
 
+from xlranker.util.gene_sets import GeneSetIndex, gmts_to_csr
+from xlranker.util.ppi import PPIIndex
 
+GENE_SET_GENES = "gmt_genes.npy"
+GENE_SET_INDPTR = "gmt_indptr.npy"
+GENE_SET_INDICES = "gmt_indices.npy"
+PPI_PROTEINS = "ppi_proteins.npy"
+PPI_KEYS = "ppi_keys.npy"
+
+
+def write_names(path: str | Path, names: list[str]) -> None:
+    """Save names as a UTF-8 encoded .npy file."""
+    np.save(path, np.array([name.encode() for name in names], dtype=np.bytes_))
+
+
+def read_names(path: str | Path) -> list[str]:
+    """Load names saved with `write_names`."""
+    return [name.decode() for name in np.load(path, mmap_mode="r").tolist()]
+
+
+@cache
 def load_default_ppi() -> pl.DataFrame:
     """load default pre-generated table of known PPIs from parquet file into polars DataFrame.
 
+    Loaded once and cached for the life of the process.
+
     Returns:
         pl.DataFrame: Two column database with column names of P1 and P2 where P1 and P2 have a known PPI.
     """
@@ -23,6 +48,106 @@ def load_gmts() -> list[list[set[str]]]:
         return pickle.load(r)
 
 
+def write_gene_set_db(gmts: list[list[set[str]]], directory: str | Path = ".") -> None:
+    """Write GMTs in the compact format read by `load_gene_set_index`.
+
+    The gene dictionary (UTF-8) and the compressed sparse row (CSR) set membership are
+    saved as three .npy files, which load without parsing.
+
+    Args:
+        gmts (list[list[set[str]]]): list of gmts, which are lists of sets
+        directory (str | Path, optional): directory to write the files to. Defaults to ".".
+
+    """
+    directory = Path(directory)
+    genes, set_indptr, gene_indices = gmts_to_csr(gmts)
+    write_names(directory / GENE_SET_GENES, genes)
+    np.save(directory / GENE_SET_INDPTR, set_indptr)
+    np.save(directory / GENE_SET_INDICES, gene_indices)
+
+
+def read_gene_set_db(directory: str | Path) -> GeneSetIndex:
+    """Read GMTs written by `write_gene_set_db` into a `GeneSetIndex`.
+
+    The CSR files are memory-mapped, which saves parsing them. The index still copies
+    the membership into dense per-gene bitsets, so memory use is that of the bitsets.
+
+    Args:
+        directory (str | Path): directory with the compact GMT files
+
+    Returns:
+        GeneSetIndex: index over all sets of the GMTs
+    """
+    directory = Path(directory)
+    set_indptr = np.load(directory / GENE_SET_INDPTR, mmap_mode="r")
+    gene_indices = np.load(directory / GENE_SET_INDICES, mmap_mode="r")
+    return GeneSetIndex(
+        read_names(directory / GENE_SET_GENES), set_indptr, gene_indices
+    )
+
+
+@cache
+def load_gene_set_index() -> GeneSetIndex:
+    """Load the default GMTs as a `GeneSetIndex`.
+
+    Loaded from the compact format on first use and cached for the life of the process.
+
+    Returns:
+        GeneSetIndex: index over all sets of the default GMTs
+    """
+    return read_gene_set_db(str(files("xlranker.data")))
+
+
+def write_ppi_db(ppi_db: pl.DataFrame, directory: str | Path = ".") -> None:
+    """Write a PPI table in the integer-encoded format read by `load_default_ppi_index`.
+
+    Protein ids are capitalized, sorted and saved as a dictionary. Each interaction is
+    saved as one sorted int64 key of the two protein codes.
+
+    Args:
+        ppi_db (pl.DataFrame): PPI table with the two protein columns P1 and P2
+        directory (str | Path, optional): directory to write the files to. Defaults to ".".
+
+    """
+    directory = Path(directory)
+    index = PPIIndex.from_dataframe(
+        ppi_db.select(pl.col("P1").str.to_uppercase(), pl.col("P2").str.to_uppercase())
+    )
+    write_names(directory / PPI_PROTEINS, index.proteins)
+    keys = index.keys
+    if len(keys) == 0 or keys[-1] <= np.iinfo(np.uint32).max:
+        keys = keys.astype(np.uint32)  # halves the file size of the default table
+    np.save(directory / PPI_KEYS, keys)
+
+
+def read_ppi_index(directory: str | Path) -> PPIIndex:
+    """Read a PPI table written by `write_ppi_db` into a `PPIIndex`.
+
+    Args:
+        directory (str | Path): directory with the integer-encoded PPI files
+
+    Returns:
+        PPIIndex: membership index of all known PPIs
+    """
+    directory = Path(directory)
+    return PPIIndex(
+        read_names(directory / PPI_PROTEINS),
+        np.load(directory / PPI_KEYS, mmap_mode="r"),
+    )
+
+
+@cache
+def load_default_ppi_index() -> PPIIndex:
+    """Load the default PPI table as a `PPIIndex` with uppercase protein ids.
+
+    Loaded from the integer-encoded format on first use and cached for the life of the process.
+
+    Returns:
+        PPIIndex: membership index of all default known PPIs
+    """
+    return read_ppi_index(str(files("xlranker.data")))
+
+
 def get_gencode_fasta() -> str:
     gencode_path = str(files("xlranker.data") / "uniprot_5_22.fa.tar.xz")
     with lzma.open(gencode_path) as r:
@@ -1,5 +1,6 @@
 import logging
 import sys
+from collections.abc import Iterable
 
 import polars as pl
 
@@ -9,7 +10,7 @@ from xlranker.util.mapping import FastaType, PeptideMapper, convert_str_to_fasta
 from xlranker.util.readers import read_data_folder, read_network_file
 
 from .bio import Protein
-from .bio.pairs import PeptidePair, ProteinPair
+from .bio.pairs import PairRegistry, PeptidePair, ProteinPair
 from .status import PrioritizationStatus
 
 logger = logging.getLogger(__name__)
@@ -53,12 +54,16 @@ class XLDataSet:
     Attributes:
         network (dict[str, PeptidePair]): Dictionary of peptide pairs, where the key is a unique identifier for the pair.
         omic_data (dict[str, pl.DataFrame]): Dictionary of omic data, where the key is the file name and the value is a Polars DataFrame containing the data.
+        registry (PairRegistry): index of the protein pairs by status, kept up to date as protein pairs are added, removed, and prioritized.
+        protein_references (dict[str, int]): number of connected peptide pairs mapping each protein
     """
 
     peptide_pairs: dict[str, PeptidePair]
     omic_data: dict[str, pl.DataFrame]
     proteins: dict[str, Protein]
     protein_pairs: dict[str, ProteinPair]
+    registry: PairRegistry
+    protein_references: dict[str, int]
 
     def __init__(
         self, network: dict[str, PeptidePair], omic_data: dict[str, pl.DataFrame]
@@ -67,6 +72,8 @@ class XLDataSet:
         self.omic_data = omic_data
         self.protein_pairs = {}
         self.proteins = {}
+        self.registry = PairRegistry()
+        self.protein_references = {}
 
     def build_proteins(self, remove_intra: bool = False) -> None:
         """Build protein pairs of the XLDataSet network.
@@ -80,45 +87,126 @@ class XLDataSet:
             all_proteins = all_proteins.union(set(p_peptide_pairs.a.mapped_proteins))
             all_proteins = all_proteins.union(set(p_peptide_pairs.b.mapped_proteins))
         for protein in all_proteins:
-            abundances = {}
-            for omic_file in self.omic_data:
-                abundances[omic_file] = get_abundance(
-                    self.omic_data[omic_file], protein
-                )
-            self.proteins[protein] = Protein(protein, protein, abundances)
+            self.add_protein(protein)
         remove_pairs = []
-        for (
-            peptide_pair_key
-        ) in self.peptide_pairs.keys():  # TODO: Make this loop cleaner to read
-            peptide_pair = self.peptide_pairs[peptide_pair_key]
-            peptide_pair_id = get_pair_id(peptide_pair.a, peptide_pair.b)
-            had_intra = False
-            for protein_a_name in peptide_pair.a.mapped_proteins:
-                for protein_b_name in peptide_pair.b.mapped_proteins:
-                    if remove_intra and protein_a_name == protein_b_name:
-                        had_intra = True
-                        break
-            if had_intra:
+        for peptide_pair_key, peptide_pair in self.peptide_pairs.items():
+            if remove_intra and has_intra_mapping(peptide_pair):
                 remove_pairs.append(peptide_pair_key)
             else:
-                for protein_a_name in peptide_pair.a.mapped_proteins:
-                    protein_a = self.proteins[protein_a_name]
-                    for protein_b_name in peptide_pair.b.mapped_proteins:
-                        protein_b = self.proteins[protein_b_name]
-                        protein_pair_id = get_pair_id(protein_a, protein_b)
-                        if protein_pair_id not in self.protein_pairs:
-                            new_pair = ProteinPair(protein_a, protein_b)
-                            self.protein_pairs[protein_pair_id] = new_pair
-                            peptide_pair.add_connection(protein_pair_id)
-                            new_pair.add_connection(peptide_pair_id)
-                        else:
-                            self.protein_pairs[protein_pair_id].add_connection(
-                                peptide_pair_id
-                            )
-                            peptide_pair.add_connection(protein_pair_id)
+                self.connect_peptide_pair(peptide_pair)
         for key in remove_pairs:
             self.peptide_pairs.pop(key)
 
+    def add_protein(self, protein: str) -> Protein:
+        """Create the Protein object for `protein` with abundances from all omic data.
+
+        Args:
+            protein (str): name of the protein
+
+        Returns:
+            Protein: the newly created protein
+
+        """
+        abundances = {}
+        for omic_file in self.omic_data:
+            abundances[omic_file] = get_abundance(self.omic_data[omic_file], protein)
+        self.proteins[protein] = Protein(protein, protein, abundances)
+        return self.proteins[protein]
+
+    def connect_peptide_pair(self, peptide_pair: PeptidePair) -> set[str]:
+        """Connect a peptide pair to all protein pairs it maps to, creating new protein pairs when needed.
+
+        Args:
+            peptide_pair (PeptidePair): peptide pair with mapped proteins. All mapped proteins must be in `proteins`.
+
+        Returns:
+            set[str]: ids of the protein pairs connected to the peptide pair
+
+        """
+        peptide_pair_id = get_pair_id(peptide_pair.a, peptide_pair.b)
+        for protein in mapped_proteins(peptide_pair):
+            self.protein_references[protein] = (
+                self.protein_references.get(protein, 0) + 1
+            )
+        connected: set[str] = set()
+        for protein_a_name in peptide_pair.a.mapped_proteins:
+            protein_a = self.proteins[protein_a_name]
+            for protein_b_name in peptide_pair.b.mapped_proteins:
+                protein_b = self.proteins[protein_b_name]
+                protein_pair_id = get_pair_id(protein_a, protein_b)
+                if protein_pair_id not in self.protein_pairs:
+                    protein_pair = ProteinPair(protein_a, protein_b)
+                    self.protein_pairs[protein_pair_id] = protein_pair
+                    self.registry.add(protein_pair)
+                self.protein_pairs[protein_pair_id].add_connection(peptide_pair_id)
+                peptide_pair.add_connection(protein_pair_id)
+                connected.add(protein_pair_id)
+        return connected
+
+    def add_peptide_pairs(
+        self, peptide_pairs: dict[str, PeptidePair], remove_intra: bool = False
+    ) -> set[str]:
+        """Add new peptide pairs to an already built network.
+
+        Only the proteins and protein pairs touched by the new peptide pairs are created or updated.
+        Peptide pairs already in the network are ignored.
+
+        Args:
+            peptide_pairs (dict[str, PeptidePair]): peptide pairs to add, keyed by pair id. Peptides must already have their mapped proteins.
+            remove_intra (bool, optional): if true, skip peptide pairs that could map to an intra protein pair. Defaults to False.
+
+        Returns:
+            set[str]: ids of all protein pairs connected to the added peptide pairs
+
+        """
+        touched: set[str] = set()
+        for key, peptide_pair in peptide_pairs.items():
+            if key in self.peptide_pairs:
+                logger.debug(f"Peptide pair {key} already in network. Skipping.")
+                continue
+            if remove_intra and has_intra_mapping(peptide_pair):
+                continue
+            for protein in mapped_proteins(peptide_pair):
+                if protein not in self.proteins:
+                    self.add_protein(protein)
+            self.peptide_pairs[key] = peptide_pair
+            touched.update(self.connect_peptide_pair(peptide_pair))
+        return touched
+
+    def remove_peptide_pairs(self, peptide_pair_ids: Iterable[str]) -> set[str]:
+        """Remove peptide pairs from an already built network.
+
+        Protein pairs left without any peptide pair are removed, as are proteins no longer mapped by any peptide pair.
+
+        Args:
+            peptide_pair_ids (Iterable[str]): ids of the peptide pairs to remove. Unknown ids are ignored.
+
+        Returns:
+            set[str]: ids of the remaining protein pairs that lost a connection
+
+        """
+        touched: set[str] = set()
+        for key in peptide_pair_ids:
+            peptide_pair = self.peptide_pairs.pop(key, None)
+            if peptide_pair is None:
+                logger.debug(f"Peptide pair {key} not in network. Skipping.")
+                continue
+            for protein in mapped_proteins(peptide_pair):
+                references = self.protein_references.pop(protein, 0) - 1
+                if references > 0:
+                    self.protein_references[protein] = references
+                else:
+                    self.proteins.pop(protein, None)
+            for protein_pair_id in peptide_pair.connections:
+                protein_pair = self.protein_pairs[protein_pair_id]
+                protein_pair.remove_connections({key})
+                if protein_pair.n_connections() == 0:
+                    self.registry.remove(self.protein_pairs.pop(protein_pair_id))
+                    touched.discard(protein_pair_id)
+                else:
+                    touched.add(protein_pair_id)
+        return touched
+
     @classmethod
     def load_from_network(
         cls,
@@ -177,19 +265,44 @@ class XLDataSet:
         return cls(network, omic_data)
 
 
+def has_intra_mapping(peptide_pair: PeptidePair) -> bool:
+    """Check if a peptide pair can map to the same protein on both sides.
+
+    Args:
+        peptide_pair (PeptidePair): peptide pair with mapped proteins
+
+    Returns:
+        bool: True if any protein is mapped by both peptides
+
+    """
+    return not set(peptide_pair.a.mapped_proteins).isdisjoint(
+        peptide_pair.b.mapped_proteins
+    )
+
+
+def mapped_proteins(peptide_pair: PeptidePair) -> set[str]:
+    """Get the proteins mapped by either peptide of a peptide pair.
+
+    Args:
+        peptide_pair (PeptidePair): peptide pair with mapped proteins
+
+    Returns:
+        set[str]: names of the mapped proteins
+
+    """
+    return set(peptide_pair.a.mapped_proteins).union(peptide_pair.b.mapped_proteins)
+
+
 def get_final_network(
     data_set: XLDataSet, pair_selector: PairSelector = BestSelector()
 ) -> list[ProteinPair]:
     pair_selector.process(list(data_set.protein_pairs.values()))
-    return [
-        pair
-        for pair in data_set.protein_pairs.values()
-        if pair.prioritization_status == PrioritizationStatus.ML_PRIMARY_SELECTED
-        or pair.prioritization_status == PrioritizationStatus.ML_SECONDARY_SELECTED
-        or pair.prioritization_status == PrioritizationStatus.PARSIMONY_PRIMARY_SELECTED
-        or pair.prioritization_status
-        == PrioritizationStatus.PARSIMONY_SECONDARY_SELECTED
-    ]
+    return data_set.registry.with_status(
+        PrioritizationStatus.ML_PRIMARY_SELECTED,
+        PrioritizationStatus.ML_SECONDARY_SELECTED,
+        PrioritizationStatus.PARSIMONY_PRIMARY_SELECTED,
+        PrioritizationStatus.PARSIMONY_SECONDARY_SELECTED,
+    )
 
 
 def write_pair_to_network(pairs: list[ProteinPair], output_file: str) -> None:
@@ -0,0 +1,113 @@
+"""Streaming aggregation of model run predictions."""
+
+import numpy as np
+
+AGREEMENT_THRESHOLD = 0.5  # runs vote for a pair if its prediction is at least this
+
+
+class PredictionAccumulator:
+    """Running mean, variance and agreement of predictions over model runs.
+
+    Uses Welford's online algorithm, so memory depends on the number of pairs only
+    and runs can be added as they finish.
+
+    Attributes:
+        count (int): number of runs added
+        mean (np.ndarray): running mean prediction of every pair
+        m2 (np.ndarray): running sum of squared differences from the mean
+        votes (np.ndarray): number of runs with a prediction of at least `AGREEMENT_THRESHOLD`
+
+    """
+
+    count: int
+    mean: np.ndarray
+    m2: np.ndarray
+    votes: np.ndarray
+
+    def __init__(self, n_pairs: int):
+        """Initialize the PredictionAccumulator
+
+        Args:
+            n_pairs (int): number of predicted pairs
+
+        """
+        self.count = 0
+        self.mean = np.zeros(n_pairs)
+        self.m2 = np.zeros(n_pairs)
+        self.votes = np.zeros(n_pairs, dtype=np.int64)
+
+    def add(self, predictions: np.ndarray) -> None:
+        """Add the predictions of one run.
+
+        Args:
+            predictions (np.ndarray): prediction of every pair
+
+        """
+        self.count += 1
+        delta = predictions - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (predictions - self.mean)
+        self.votes += predictions >= AGREEMENT_THRESHOLD
+
+    def std(self) -> np.ndarray:
+        """Standard deviation of the predictions over runs."""
+        if self.count == 0:
+            return np.zeros_like(self.mean)
+        return np.sqrt(self.m2 / self.count)
+
+    def agreement(self) -> np.ndarray:
+        """Fraction of runs that agree with the majority call of every pair."""
+        if self.count == 0:
+            return np.ones_like(self.mean)
+        return np.maximum(self.votes, self.count - self.votes) / self.count
+
+
+class ConvergenceMonitor:
+    """Detects when the running mean predictions stop changing between runs.
+
+    Attributes:
+        tolerance (float): largest absolute change of any mean prediction that counts as converged
+        patience (int): number of consecutive converged runs needed to stop
+        streak (int): current number of consecutive converged runs
+        last_delta (float): largest absolute change of the last update
+        previous (np.ndarray | None): mean predictions after the previous run
+
+    """
+
+    tolerance: float
+    patience: int
+    streak: int
+    last_delta: float
+    previous: np.ndarray | None
+
+    def __init__(self, tolerance: float, patience: int = 2):
+        """Initialize the ConvergenceMonitor
+
+        Args:
+            tolerance (float): largest absolute change of any mean prediction that counts as converged
+            patience (int, optional): number of consecutive converged runs needed to stop. Defaults to 2.
+
+        """
+        self.tolerance = tolerance
+        self.patience = patience
+        self.streak = 0
+        self.last_delta = float("inf")
+        self.previous = None
+
+    def update(self, mean: np.ndarray) -> bool:
+        """Record the running mean after a run.
+
+        Args:
+            mean (np.ndarray): running mean prediction of every pair
+
+        Returns:
+            bool: True if the mean changed less than `tolerance` for `patience` runs in a row
+
+        """
+        if self.previous is not None:
+            self.last_delta = (
+                float(np.max(np.abs(mean - self.previous))) if len(mean) else 0.0
+            )
+            self.streak = self.streak + 1 if self.last_delta < self.tolerance else 0
+        self.previous = mean.copy()
+        return self.streak >= self.patience
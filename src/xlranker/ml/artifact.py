@@ -0,0 +1,150 @@
+"""Saving and loading trained prioritization models."""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+from xlranker.ml.backends import get_backend
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def xlranker_version() -> str:
+    try:
+        return version("xlranker")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def config_hash(model_config: dict[str, Any]) -> str:
+    """Get a stable hash of a model config.
+
+    Args:
+        model_config (dict[str, Any]): JSON serializable model config
+
+    Returns:
+        str: sha256 hex digest of the config
+
+    """
+    encoded = json.dumps(model_config, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+@dataclass
+class ModelArtifact:
+    """Trained models of every run and the schema needed to reuse them.
+
+    Saved as a directory with a `manifest.json` and one model file per model, in the
+    format of the backend.
+
+    Attributes:
+        feature_names (list[str]): names of the feature columns, in model input order
+        omic_names (list[str]): names of the omics files, in feature order
+        uses_ppi (bool): if True, the last feature is is_ppi
+        uppercase (bool): if True, protein names were capitalized for the PPI lookup
+        model_config (dict[str, Any]): config the models were trained with
+        run_models (list[list[Any]]): models of each run. The prediction of a run is the mean of its models.
+        backend (str): name of the backend that trained the models
+        xlranker_version (str): version of XLRanker that trained the models
+
+    """
+
+    feature_names: list[str]
+    omic_names: list[str]
+    uses_ppi: bool
+    uppercase: bool
+    model_config: dict[str, Any]
+    run_models: list[list[Any]]
+    backend: str = "xgboost"
+    xlranker_version: str = xlranker_version()
+
+    @property
+    def config_hash(self) -> str:
+        return config_hash(self.model_config)
+
+    def save(self, path: str | Path) -> Path:
+        """Save the artifact to a directory.
+
+        Args:
+            path (str | Path): directory to save to. Created if it does not exist.
+
+        Returns:
+            Path: path of the manifest
+
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        backend = get_backend(self.backend)
+        model_files = []
+        for run, models in enumerate(self.run_models):
+            run_files = []
+            for i, model in enumerate(models):
+                file_name = f"run_{run}_model_{i}{backend.file_suffix}"
+                backend.save_model(model, path / file_name)
+                run_files.append(file_name)
+            model_files.append(run_files)
+        manifest = {
+            "artifact_version": ARTIFACT_VERSION,
+            "xlranker_version": self.xlranker_version,
+            "backend": self.backend,
+            "feature_names": self.feature_names,
+            "omic_names": self.omic_names,
+            "uses_ppi": self.uses_ppi,
+            "uppercase": self.uppercase,
+            "model_config": self.model_config,
+            "config_hash": self.config_hash,
+            "models": model_files,
+        }
+        manifest_path = path / MANIFEST_NAME
+        with open(manifest_path, "w") as w:
+            json.dump(manifest, w, indent=2, default=str)
+        logger.info(f"Saved model artifact to {path}")
+        return manifest_path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ModelArtifact":
+        """Load an artifact saved with `ModelArtifact.save`.
+
+        Args:
+            path (str | Path): artifact directory or path of its manifest
+
+        Raises:
+            ValueError: Raised if the artifact version is not supported or the config hash does not match
+
+        Returns:
+            ModelArtifact: the loaded artifact
+
+        """
+        path = Path(path)
+        if path.is_dir():
+            path = path / MANIFEST_NAME
+        with open(path) as r:
+            manifest = json.load(r)
+        if manifest.get("artifact_version") != ARTIFACT_VERSION:
+            raise ValueError(
+                f"Unsupported model artifact version: {manifest.get('artifact_version')}"
+            )
+        if config_hash(manifest["model_config"]) != manifest["config_hash"]:
+            raise ValueError("Model artifact config does not match its config hash")
+        backend = get_backend(manifest["backend"])
+        run_models = [
+            [backend.load_model(path.parent / file_name) for file_name in run_files]
+            for run_files in manifest["models"]
+        ]
+        return cls(
+            feature_names=manifest["feature_names"],
+            omic_names=manifest["omic_names"],
+            uses_ppi=manifest["uses_ppi"],
+            uppercase=manifest["uppercase"],
+            model_config=manifest["model_config"],
+            run_models=run_models,
+            backend=manifest["backend"],
+            xlranker_version=manifest["xlranker_version"],
+        )
@@ -0,0 +1,329 @@
+"""Classifiers used by the prioritization model."""
+
+import pickle
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, ClassVar
+
+import numpy as np
+import xgboost
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+
+def booster_params(xgb_params: dict[str, Any], seed: int) -> tuple[dict[str, Any], int]:
+    """Convert XGBClassifier parameters into `xgboost.train` parameters.
+
+    Args:
+        xgb_params (dict[str, Any]): parameters in the XGBClassifier format
+        seed (int): random seed of the model
+
+    Returns:
+        tuple[dict[str, Any], int]: booster parameters and the number of boosting rounds
+
+    """
+    params = dict(xgb_params)
+    num_boost_round = params.pop("n_estimators", None) or 100  # XGBClassifier default
+    params.pop("random_state", None)
+    params["seed"] = seed
+    n_jobs = params.pop("n_jobs", None)
+    if n_jobs is not None:
+        params["nthread"] = n_jobs
+    return params, num_boost_round
+
+
+class ModelBackend(ABC):
+    """Trains and applies the classifiers of one model run.
+
+    A backend is created for every run. `start_run` receives the training matrix of the
+    run, and `fit` trains a model on a subset of its rows, so backends can reuse work
+    that is shared by the fold models and the final model of a run.
+
+    Attributes:
+        name (str): name of the backend in `ModelConfig.backend`
+        file_suffix (str): suffix of saved model files
+        supports_contributions (bool): if True, `contributions` gives per-feature attributions
+        supports_warm_start (bool): if True, `continue_fit` can train saved models further
+        params (dict[str, Any]): parameters of the classifier
+        n_threads (int | None): number of threads per model. If None, the library decides.
+
+    """
+
+    name: str
+    file_suffix: str
+    supports_contributions: bool = False
+    supports_warm_start: bool = False
+    params: dict[str, Any]
+    n_threads: int | None
+
+    def __init__(self, params: dict[str, Any], n_threads: int | None = None):
+        """Initialize the backend
+
+        Args:
+            params (dict[str, Any]): parameters of the classifier
+            n_threads (int | None, optional): number of threads per model. If None, the library decides. Defaults to None.
+
+        """
+        self.params = dict(params)
+        self.n_threads = n_threads
+        self.X = np.empty((0, 0))
+        self.y = np.empty(0)
+
+    def start_run(self, X: np.ndarray, y: np.ndarray) -> None:
+        """Set the training matrix of the run.
+
+        Args:
+            X (np.ndarray): features of all training pairs of the run
+            y (np.ndarray): labels of all training pairs of the run
+
+        """
+        self.X = X
+        self.y = y
+
+    def training_rows(self, rows: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+        if rows is None:
+            return self.X, self.y
+        return self.X[rows], self.y[rows]
+
+    @abstractmethod
+    def fit(self, rows: np.ndarray | None, seed: int) -> Any:
+        """Train a model on rows of the run's training matrix.
+
+        Args:
+            rows (np.ndarray | None): indices of the training rows. If None, uses all rows.
+            seed (int): random seed of the model
+
+        Returns:
+            Any: the trained model
+
+        """
+
+    @abstractmethod
+    def predict(self, model: Any, X: np.ndarray) -> np.ndarray:
+        """Get the probability of the positive class.
+
+        Args:
+            model (Any): model returned by `fit`
+            X (np.ndarray): features of the pairs to predict
+
+        Returns:
+            np.ndarray: predictions between 0 and 1
+
+        """
+
+    def contributions(self, model: Any, X: np.ndarray) -> np.ndarray:
+        """Get the contribution of every feature to the prediction of every pair.
+
+        Args:
+            model (Any): model returned by `fit`
+            X (np.ndarray): features of the pairs to explain
+
+        Raises:
+            NotImplementedError: Raised if the backend does not support attributions
+
+        Returns:
+            np.ndarray: array of shape (pairs, features + 1) in log-odds. The last column is the bias.
+
+        """
+        raise NotImplementedError(
+            f"{self.name} backend does not support feature attribution"
+        )
+
+    def continue_fit(
+        self, model: Any, rows: np.ndarray | None, seed: int, rounds: int
+    ) -> Any:
+        """Train a saved model further on rows of the run's training matrix.
+
+        Args:
+            model (Any): model returned by `fit`, possibly of an earlier run. Not modified.
+            rows (np.ndarray | None): indices of the training rows. If None, uses all rows.
+            seed (int): random seed of the added training
+            rounds (int): number of boosting rounds to add
+
+        Raises:
+            NotImplementedError: Raised if the backend does not support warm starts
+
+        Returns:
+            Any: the updated model
+
+        """
+        raise NotImplementedError(f"{self.name} backend does not support warm starts")
+
+    @classmethod
+    def save_model(cls, model: Any, path: Path) -> None:
+        with open(path, "wb") as w:
+            pickle.dump(model, w)
+
+    @classmethod
+    def load_model(cls, path: Path) -> Any:
+        with open(path, "rb") as r:
+            return pickle.load(r)
+
+
+class XGBoostBackend(ModelBackend):
+    """XGBoost through the scikit-learn interface. Models are stored as boosters."""
+
+    name = "xgboost"
+    file_suffix = ".ubj"
+    supports_contributions = True
+    supports_warm_start = True
+
+    def fit(self, rows: np.ndarray | None, seed: int) -> xgboost.Booster:
+        params = dict(self.params)
+        if self.n_threads is not None:
+            params["n_jobs"] = self.n_threads
+        model = xgboost.XGBClassifier(**params, random_state=seed)
+        model.fit(*self.training_rows(rows))
+        return model.get_booster()
+
+    def predict(self, model: xgboost.Booster, X: np.ndarray) -> np.ndarray:
+        return model.inplace_predict(X)
+
+    def training_data(self, rows: np.ndarray | None) -> xgboost.QuantileDMatrix:
+        return xgboost.QuantileDMatrix(
+            *self.training_rows(rows), nthread=self.n_threads
+        )
+
+    def continue_fit(
+        self, model: xgboost.Booster, rows: np.ndarray | None, seed: int, rounds: int
+    ) -> xgboost.Booster:
+        params = dict(self.params)
+        if self.n_threads is not None:
+            params["n_jobs"] = self.n_threads
+        params, _ = booster_params(params, seed)
+        # xgb_model is copied, the saved model keeps its trees
+        return xgboost.train(
+            params, self.training_data(rows), num_boost_round=rounds, xgb_model=model
+        )
+
+    def contributions(self, model: xgboost.Booster, X: np.ndarray) -> np.ndarray:
+        # TreeSHAP values computed by XGBoost
+        data = xgboost.DMatrix(X, nthread=self.n_threads or -1)
+        return model.predict(data, pred_contribs=True)
+
+    @classmethod
+    def save_model(cls, model: xgboost.Booster, path: Path) -> None:
+        model.save_model(str(path))
+
+    @classmethod
+    def load_model(cls, path: Path) -> xgboost.Booster:
+        model = xgboost.Booster()
+        model.load_model(str(path))
+        return model
+
+
+class NativeXGBoostBackend(XGBoostBackend):
+    """XGBoost through `xgboost.train`.
+
+    One QuantileDMatrix is built per run. Fold subsets share its bin boundaries, and the
+    final model trains on it directly.
+    """
+
+    name = "xgboost-native"
+
+    def start_run(self, X: np.ndarray, y: np.ndarray) -> None:
+        super().start_run(X, y)
+        self.full_data = xgboost.QuantileDMatrix(X, label=y, nthread=self.n_threads)
+
+    def fit(self, rows: np.ndarray | None, seed: int) -> xgboost.Booster:
+        params = dict(self.params)
+        if self.n_threads is not None:
+            params["n_jobs"] = self.n_threads
+        params, num_boost_round = booster_params(params, seed)
+        return xgboost.train(
+            params, self.training_data(rows), num_boost_round=num_boost_round
+        )
+
+    def training_data(self, rows: np.ndarray | None) -> xgboost.QuantileDMatrix:
+        if rows is None:
+            return self.full_data
+        return xgboost.QuantileDMatrix(
+            *self.training_rows(rows), ref=self.full_data, nthread=self.n_threads
+        )
+
+
+class LogisticBackend(ModelBackend):
+    """L2-regularized logistic regression on median-imputed, standardized features.
+
+    Much faster than the tree backends, meant for quick looks.
+    """
+
+    name = "logistic"
+    file_suffix = ".pkl"
+    default_params: ClassVar[dict[str, Any]] = {"C": 1.0, "max_iter": 200}
+
+    def fit(self, rows: np.ndarray | None, seed: int) -> Pipeline:
+        model = make_pipeline(
+            SimpleImputer(strategy="median", keep_empty_features=True),
+            StandardScaler(),
+            LogisticRegression(
+                **(self.default_params | self.params), random_state=seed
+            ),
+        )
+        return model.fit(*self.training_rows(rows))
+
+    def predict(self, model: Pipeline, X: np.ndarray) -> np.ndarray:
+        return model.predict_proba(X)[:, 1]
+
+
+class HistGradientBoostingBackend(ModelBackend):
+    """scikit-learn's HistGradientBoostingClassifier tuned for a quick look.
+
+    The defaults trade some accuracy for speed: few small trees, fewer bins and no
+    early stopping, which would otherwise hold out part of every training set.
+    Handles missing values natively. `n_threads` is not applied, scikit-learn uses
+    its OpenMP default.
+    """
+
+    name = "hist-gradient-boosting"
+    file_suffix = ".pkl"
+    default_params: ClassVar[dict[str, Any]] = {
+        "max_iter": 15,
+        "learning_rate": 0.2,
+        "max_leaf_nodes": 15,
+        "max_bins": 64,
+        "early_stopping": False,
+    }
+
+    def fit(self, rows: np.ndarray | None, seed: int) -> HistGradientBoostingClassifier:
+        model = HistGradientBoostingClassifier(
+            **(self.default_params | self.params), random_state=seed
+        )
+        return model.fit(*self.training_rows(rows))
+
+    def predict(
+        self, model: HistGradientBoostingClassifier, X: np.ndarray
+    ) -> np.ndarray:
+        return model.predict_proba(X)[:, 1]
+
+
+BACKENDS: dict[str, type[ModelBackend]] = {
+    backend.name: backend
+    for backend in (
+        XGBoostBackend,
+        NativeXGBoostBackend,
+        LogisticBackend,
+        HistGradientBoostingBackend,
+    )
+}
+
+
+def get_backend(name: str) -> type[ModelBackend]:
+    """Get a backend class by name.
+
+    Args:
+        name (str): name of the backend
+
+    Raises:
+        ValueError: Raised if there is no backend with this name
+
+    Returns:
+        type[ModelBackend]: the backend class
+
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend {name}. Options: {list(BACKENDS)}")
+    return BACKENDS[name]
@@ -0,0 +1,148 @@
+"""Out-of-core training and prediction with XGBoost external memory."""
+
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import xgboost
+
+from xlranker.ml.features import FeatureBuilder
+
+MIB = 2**20
+# a batch gets 1 / BATCH_SHARE of the memory limit, XGBoost needs the rest
+BATCH_SHARE = 4
+
+
+def batch_rows(memory_limit: int, n_features: int) -> int:
+    """Get the number of rows of a feature batch that fits the memory limit.
+
+    Args:
+        memory_limit (int): approximate peak memory in MiB
+        n_features (int): number of feature columns
+
+    Returns:
+        int: rows per batch, at least 1
+
+    """
+    row_bytes = 4 * n_features + 16  # float32 features and two int64 protein indices
+    return max(1, memory_limit * MIB // BATCH_SHARE // row_bytes)
+
+
+def iter_batches(
+    builder: FeatureBuilder,
+    a_indices: np.ndarray,
+    b_indices: np.ndarray,
+    rows: int,
+    dtype: type = np.float32,
+) -> Iterator[tuple[slice, np.ndarray]]:
+    """Build the feature matrix of pairs in consecutive batches.
+
+    Args:
+        builder (FeatureBuilder): builder of the features
+        a_indices (np.ndarray): index of the first protein of every pair
+        b_indices (np.ndarray): index of the second protein of every pair
+        rows (int): rows per batch
+        dtype (type, optional): dtype of the feature matrices. Defaults to np.float32.
+
+    Yields:
+        tuple[slice, np.ndarray]: rows of the batch and their features
+
+    """
+    for start in range(0, len(a_indices), rows):
+        batch = slice(start, start + rows)
+        yield batch, builder.build(a_indices[batch], b_indices[batch], dtype=dtype)
+
+
+class PairBatchIter(xgboost.DataIter):
+    """Feeds the features of protein pairs to XGBoost in batches.
+
+    Features are built from protein indices when XGBoost asks for a batch, so the
+    full feature matrix never exists in memory. XGBoost keeps the quantized pages in
+    a cache on disk.
+
+    Attributes:
+        builder (FeatureBuilder): builder of the features
+        a_indices (np.ndarray): index of the first protein of every pair
+        b_indices (np.ndarray): index of the second protein of every pair
+        labels (np.ndarray): label of every pair
+        rows (int): rows per batch
+
+    """
+
+    def __init__(
+        self,
+        builder: FeatureBuilder,
+        a_indices: np.ndarray,
+        b_indices: np.ndarray,
+        labels: np.ndarray,
+        rows: int,
+        cache_prefix: str,
+    ):
+        """Initialize the PairBatchIter
+
+        Args:
+            builder (FeatureBuilder): builder of the features
+            a_indices (np.ndarray): index of the first protein of every pair
+            b_indices (np.ndarray): index of the second protein of every pair
+            labels (np.ndarray): label of every pair
+            rows (int): rows per batch
+            cache_prefix (str): path prefix of XGBoost's cache files
+
+        """
+        self.builder = builder
+        self.a_indices = a_indices
+        self.b_indices = b_indices
+        self.labels = labels
+        self.rows = rows
+        self.start = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data: Callable) -> bool:
+        if self.start >= len(self.a_indices):
+            return False
+        batch = slice(self.start, self.start + self.rows)
+        input_data(
+            data=self.builder.build(self.a_indices[batch], self.b_indices[batch]),
+            label=self.labels[batch],
+        )
+        self.start += self.rows
+        return True
+
+    def reset(self) -> None:
+        self.start = 0
+
+
+def train_external(
+    params: dict[str, Any],
+    num_boost_round: int,
+    builder: FeatureBuilder,
+    a_indices: np.ndarray,
+    b_indices: np.ndarray,
+    labels: np.ndarray,
+    rows: int,
+    cache_prefix: str | Path,
+    n_threads: int | None = None,
+) -> xgboost.Booster:
+    """Train an XGBoost model on pairs without holding their features in memory.
+
+    Args:
+        params (dict[str, Any]): booster parameters from `booster_params`
+        num_boost_round (int): number of boosting rounds
+        builder (FeatureBuilder): builder of the features
+        a_indices (np.ndarray): index of the first protein of every training pair
+        b_indices (np.ndarray): index of the second protein of every training pair
+        labels (np.ndarray): label of every training pair
+        rows (int): rows per batch
+        cache_prefix (str | Path): path prefix of XGBoost's cache files
+        n_threads (int | None, optional): number of threads. If None, XGBoost decides. Defaults to None.
+
+    Returns:
+        xgboost.Booster: trained model
+
+    """
+    batches = PairBatchIter(
+        builder, a_indices, b_indices, labels, rows, str(cache_prefix)
+    )
+    data = xgboost.ExtMemQuantileDMatrix(batches, nthread=n_threads)
+    return xgboost.train(params, data, num_boost_round=num_boost_round)
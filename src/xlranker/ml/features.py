@@ -0,0 +1,245 @@
+"""Feature matrix construction for the prioritization model."""
+
+from collections.abc import Sequence
+
+import numpy as np
+import polars as pl
+
+from xlranker.bio.pairs import ProteinPair
+from xlranker.bio.protein import Protein
+from xlranker.util.ppi import PPIIndex
+
+
+class FeatureBuilder:
+    """Builds model feature matrices from a protein by omics abundance matrix.
+
+    Features of a pair are gathered by integer protein index. For every omics file,
+    the larger abundance of the pair is the `_a` feature and the smaller the `_b`
+    feature, with the same missing value handling as `ProteinPair.abundance_dict`.
+
+    Attributes:
+        protein_ids (list[str]): ids of the proteins. The position of an id is its index.
+        index (dict[str, int]): index of each protein id
+        omic_names (list[str]): names of the omics files, in feature order
+        abundances (np.ndarray): float64 array of shape (proteins, omics) with NaN for missing values
+        ppi_index (PPIIndex | None): index used for the is_ppi feature. If None, the feature is not added.
+        ppi_codes (np.ndarray): PPI index code of each protein
+        feature_names (list[str]): names of the feature columns
+
+    """
+
+    protein_ids: list[str]
+    index: dict[str, int]
+    omic_names: list[str]
+    abundances: np.ndarray
+    ppi_index: PPIIndex | None
+    ppi_codes: np.ndarray
+    feature_names: list[str]
+
+    def __init__(
+        self,
+        proteins: Sequence[Protein],
+        omic_names: Sequence[str],
+        ppi_index: PPIIndex | None = None,
+        uppercase: bool = True,
+    ):
+        """Initialize the FeatureBuilder
+
+        Args:
+            proteins (Sequence[Protein]): proteins that can be part of a pair
+            omic_names (Sequence[str]): names of the omics files, in feature order
+            ppi_index (PPIIndex | None, optional): index used for the is_ppi feature. If None, the feature is not added. Defaults to None.
+            uppercase (bool, optional): if True, protein names are capitalized for the PPI lookup. Defaults to True.
+
+        """
+        self.protein_ids = [protein.name for protein in proteins]
+        self.index = {protein: i for i, protein in enumerate(self.protein_ids)}
+        self.omic_names = list(omic_names)
+        self.abundances = np.array(
+            [
+                [protein.abundances.get(omic, None) for omic in self.omic_names]
+                for protein in proteins
+            ],
+            dtype=np.float64,
+        ).reshape(len(self.protein_ids), len(self.omic_names))
+        self.ppi_index = ppi_index
+        if ppi_index is not None:
+            names = pl.Series(self.protein_ids, dtype=pl.String)
+            if uppercase:  # Capitalize to ensure consistent case
+                names = names.str.to_uppercase()
+            self.ppi_codes = ppi_index.encode(names)
+        else:
+            self.ppi_codes = np.empty(0, dtype=np.int64)
+        self.feature_names = []
+        for omic in self.omic_names:
+            self.feature_names.extend([f"{omic}_a", f"{omic}_b"])
+        if ppi_index is not None:
+            self.feature_names.append("is_ppi")
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def pair_indices(
+        self, pairs: Sequence[ProteinPair]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the protein indices of protein pairs.
+
+        Args:
+            pairs (Sequence[ProteinPair]): protein pairs made of proteins known to the builder
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: indices of the a and b protein of every pair
+
+        """
+        a_indices = np.fromiter(
+            (self.index[pair.a.name] for pair in pairs),
+            dtype=np.int64,
+            count=len(pairs),
+        )
+        b_indices = np.fromiter(
+            (self.index[pair.b.name] for pair in pairs),
+            dtype=np.int64,
+            count=len(pairs),
+        )
+        return a_indices, b_indices
+
+    def build(
+        self,
+        a_indices: np.ndarray,
+        b_indices: np.ndarray,
+        dtype: type = np.float32,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Build the feature matrix of pairs given by protein indices.
+
+        Args:
+            a_indices (np.ndarray): index of the first protein of every pair
+            b_indices (np.ndarray): index of the second protein of every pair
+            dtype (type, optional): dtype of the returned matrix. Ignored if `out` is given. Defaults to np.float32.
+            out (np.ndarray | None, optional): matrix of shape (pairs, n_features) to write the features into. Defaults to None.
+
+        Returns:
+            np.ndarray: matrix of shape (pairs, n_features)
+
+        """
+        a_values = self.abundances[a_indices]
+        b_values = self.abundances[b_indices]
+        n_omics = len(self.omic_names)
+        if out is None:
+            out = np.empty((len(a_indices), self.n_features), dtype=dtype)
+        features = out
+        # fmax keeps the present value if one is missing, minimum propagates the missing value
+        features[:, 0 : 2 * n_omics : 2] = np.fmax(a_values, b_values)
+        features[:, 1 : 2 * n_omics : 2] = np.minimum(a_values, b_values)
+        if self.ppi_index is not None:
+            features[:, 2 * n_omics] = self.ppi_index.contains_codes(
+                self.ppi_codes[a_indices], self.ppi_codes[b_indices]
+            )
+        return features
+
+    def build_from_pairs(
+        self, pairs: Sequence[ProteinPair], dtype: type = np.float32
+    ) -> np.ndarray:
+        """Build the feature matrix of protein pairs.
+
+        Args:
+            pairs (Sequence[ProteinPair]): protein pairs made of proteins known to the builder
+            dtype (type, optional): dtype of the returned matrix. Defaults to np.float32.
+
+        Returns:
+            np.ndarray: matrix of shape (pairs, n_features)
+
+        """
+        return self.build(*self.pair_indices(pairs), dtype=dtype)
+
+    def to_dataframe(
+        self, pair_ids: Sequence[str], features: np.ndarray
+    ) -> pl.DataFrame:
+        """Convert a feature matrix into a DataFrame with a leading pair column.
+
+        Args:
+            pair_ids (Sequence[str]): id of the pair of every row
+            features (np.ndarray): feature matrix from `build`
+
+        Returns:
+            pl.DataFrame: DataFrame with the pair column followed by the feature columns. Missing values are null.
+
+        """
+        return pl.DataFrame(
+            {"pair": pl.Series(pair_ids, dtype=pl.String)}
+            | {
+                name: pl.Series(features[:, i]).fill_nan(None)
+                for i, name in enumerate(self.feature_names)
+            }
+        )
+
+
+class TrainingBuffer:
+    """Preallocated training matrix whose leading rows hold the positive pairs.
+
+    The positive block is written once. Each run writes its negatives into the rows
+    after it and trains on a view, so the positive block is never copied.
+
+    Attributes:
+        X (np.ndarray): feature matrix with room for the positives and negatives
+        y (np.ndarray): labels, 1.0 for the positive rows and 0.0 after them
+        n_positives (int): number of positive rows
+
+    """
+
+    X: np.ndarray
+    y: np.ndarray
+    n_positives: int
+
+    def __init__(self, positive_X: np.ndarray, max_negatives: int):
+        """Initialize the TrainingBuffer
+
+        Args:
+            positive_X (np.ndarray): feature matrix of the positive pairs
+            max_negatives (int): largest number of negative rows of a run
+
+        """
+        self.n_positives = len(positive_X)
+        self.X = np.empty(
+            (self.n_positives + max_negatives, positive_X.shape[1]),
+            dtype=positive_X.dtype,
+        )
+        self.X[: self.n_positives] = positive_X
+        self.y = np.zeros(len(self.X))
+        self.y[: self.n_positives] = 1.0
+
+    def with_negatives(
+        self, builder: FeatureBuilder, a_indices: np.ndarray, b_indices: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Write the features of negative pairs after the positive block.
+
+        Args:
+            builder (FeatureBuilder): builder that created the positive block
+            a_indices (np.ndarray): index of the first protein of every negative pair
+            b_indices (np.ndarray): index of the second protein of every negative pair
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: views of the features and labels of the positives and these negatives
+
+        """
+        n_rows = self.n_positives + len(a_indices)
+        builder.build(a_indices, b_indices, out=self.X[self.n_positives : n_rows])
+        return self.X[:n_rows], self.y[:n_rows]
+
+    def with_negative_rows(
+        self, negative_X: np.ndarray, rows: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Copy rows of a precomputed negative feature matrix after the positive block.
+
+        Args:
+            negative_X (np.ndarray): feature matrix of negative pairs
+            rows (np.ndarray): indices of the rows of `negative_X` to use
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: views of the features and labels of the positives and these negatives
+
+        """
+        n_rows = self.n_positives + len(rows)
+        np.take(negative_X, rows, axis=0, out=self.X[self.n_positives : n_rows])
+        return self.X[:n_rows], self.y[:n_rows]
@@ -10,21 +10,51 @@
 import logging
 import os
 import random
+import tempfile
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Container
 
 import numpy as np
 import polars as pl
-import xgboost
 from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import StratifiedKFold
 
 from xlranker.bio.pairs import ProteinPair
 from xlranker.config import config
-from xlranker.data import load_default_ppi, load_gmts
+from xlranker.data import load_default_ppi_index, load_gene_set_index
 from xlranker.lib import XLDataSet
+from xlranker.ml.aggregation import (
+    AGREEMENT_THRESHOLD,
+    ConvergenceMonitor,
+    PredictionAccumulator,
+)
+from xlranker.ml.artifact import ModelArtifact
+from xlranker.ml.backends import (
+    BACKENDS,
+    ModelBackend,
+    XGBoostBackend,
+    booster_params,
+    get_backend,
+)
+from xlranker.ml.external import batch_rows, iter_batches, train_external
+from xlranker.ml.features import FeatureBuilder, TrainingBuffer
+from xlranker.ml.sampling import NEGATIVE_POOL_MODES, NegativePool, NegativeSampler
+from xlranker.ml.tuning import (
+    DEFAULT_PARAM_GRID,
+    SuccessiveHalving,
+    TuningResult,
+    expand_grid,
+)
 from xlranker.selection import BestSelector, PairSelector
 from xlranker.status import PrioritizationStatus
+from xlranker.util.gene_sets import GeneSetIndex
+from xlranker.util.ppi import PPIIndex
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +70,8 @@ DEFAULT_XGB_PARAMS: dict[str, Any] = {
     "tree_method": "hist",
 }
 
+ARTIFACT_DIR = "model"  # directory in the output folder with the trained models
+
 
 def in_same_set(a: str, b: str, sets: list[list[set[str]]]) -> bool:
     """Check if a and b are located in the same set in any of the exclusive sets provided
@@ -64,12 +96,36 @@ class ModelConfig:
     runs: int
     folds: int
     xgb_params: dict[str, Any]
+    n_jobs: int | None
+    backend: str
+    backend_params: dict[str, Any] | None
+    fold_ensemble: bool
+    negative_pool: str | None
+    attribution: bool
+    convergence_tolerance: float | None
+    convergence_patience: int
+    memory_limit: int | None
+    warm_start: str | None
+    warm_start_rounds: int
+    save_artifact: bool
 
     def __init__(
         self,
         runs: int = 10,
         folds: int = 5,
         xgb_params: dict[str, Any] = DEFAULT_XGB_PARAMS,
+        n_jobs: int | None = None,
+        backend: str = "xgboost",
+        backend_params: dict[str, Any] | None = None,
+        fold_ensemble: bool = False,
+        negative_pool: str | None = None,
+        attribution: bool = False,
+        convergence_tolerance: float | None = None,
+        convergence_patience: int = 2,
+        memory_limit: int | None = None,
+        warm_start: str | None = None,
+        warm_start_rounds: int = 10,
+        save_artifact: bool = False,
     ):
         """Config for the prioritization model
 
@@ -77,17 +133,108 @@ class ModelConfig:
             runs (int, optional): the number of model runs. Defaults to 10.
             folds (int, optional): number of folds per run. Defaults to 5.
             xgb_params (dict[str, Any], optional): dictionary of parameters for the XGBoost model. Defaults to DEFAULT_XGB_PARAMS.
+            n_jobs (int | None, optional): total number of threads shared by concurrent runs and XGBoost. -1 uses all cores. If None, runs are sequential and XGBoost picks its own thread count. Defaults to None.
+            backend (str, optional): classifier backend, one of "xgboost", "xgboost-native", "logistic", and "hist-gradient-boosting". "xgboost-native" trains with `xgboost.train` on one QuantileDMatrix per run. "logistic" and "hist-gradient-boosting" are fast backends for quick looks. Defaults to "xgboost".
+            backend_params (dict[str, Any] | None, optional): parameters of the "logistic" and "hist-gradient-boosting" backends, overriding their defaults. The XGBoost backends use `xgb_params`. Defaults to None.
+            fold_ensemble (bool, optional): if True, the predictions of a run are the mean of its cross-validation models instead of a model trained on all data. Saves one fit per run. Defaults to False.
+            negative_pool (str | None, optional): if set, negatives for all runs are sampled and featurized once up front. "disjoint" gives every run its own negatives, "subsample" draws a random subset of the pool per run, without replacement. If None, each run samples its own negatives. Defaults to None.
+            attribution (bool, optional): if True, write the TreeSHAP contribution of every feature to every prediction, averaged over runs, to feature_attribution.tsv. Only supported by the XGBoost backends and not with `memory_limit`, as the contributions of all pairs are held in memory. Defaults to False.
+            convergence_tolerance (float | None, optional): if set, stop before `runs` runs once no mean prediction changed by this much or more for `convergence_patience` runs in a row. Ignored with `warm_start`, which always continues every saved run. Defaults to None.
+            convergence_patience (int, optional): number of consecutive converged runs needed to stop. Defaults to 2.
+            memory_limit (int | None, optional): if set, approximate peak memory in MiB for feature matrices. Training uses XGBoost external memory and features are built in batches, so the training and prediction matrices are never held in memory. Requires an XGBoost backend and no `attribution`, and ignores `negative_pool`. Defaults to None.
+            warm_start (str | None, optional): if set, directory of a saved model artifact. Instead of training from scratch, every saved run model is boosted for `warm_start_rounds` more rounds on newly sampled training data, without cross-validation. The number of runs is taken from the artifact. Requires an XGBoost backend and no `memory_limit`. Defaults to None.
+            warm_start_rounds (int, optional): number of boosting rounds added to each model in a warm start. Defaults to 10.
+            save_artifact (bool, optional): if True, `run_model` saves the trained models of all runs as a model artifact in the `model` directory of `config.output`. Defaults to False.
 
         """
         self.runs = runs
         self.folds = folds
         self.xgb_params = xgb_params
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.backend_params = backend_params
+        self.fold_ensemble = fold_ensemble
+        self.negative_pool = negative_pool
+        self.attribution = attribution
+        self.convergence_tolerance = convergence_tolerance
+        self.convergence_patience = convergence_patience
+        self.memory_limit = memory_limit
+        self.warm_start = warm_start
+        self.warm_start_rounds = warm_start_rounds
+        self.save_artifact = save_artifact
+
+    def thread_plan(self) -> tuple[int, int | None]:
+        """Split the thread budget between concurrent runs and XGBoost threads.
+
+        Returns:
+            tuple[int, int | None]: number of concurrent runs and threads per XGBoost model. Threads are None if not limited.
+
+        """
+        if self.n_jobs is None:
+            return 1, None
+        n_jobs = os.cpu_count() or 1 if self.n_jobs == -1 else self.n_jobs
+        concurrent_runs = max(1, min(self.runs, n_jobs))
+        return concurrent_runs, max(1, n_jobs // concurrent_runs)
+
+    def create_backend(self, n_threads: int | None = None) -> ModelBackend:
+        """Create the classifier backend of a run.
+
+        Args:
+            n_threads (int | None, optional): number of threads per model. If None, the library decides. Defaults to None.
+
+        Returns:
+            ModelBackend: backend with the parameters from this config
+
+        """
+        backend = get_backend(self.backend)
+        if issubclass(backend, XGBoostBackend):
+            params = self.xgb_params
+        else:
+            params = self.backend_params or {}
+        return backend(params, n_threads)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "folds": self.folds,
+            "xgb_params": dict(self.xgb_params),
+            "n_jobs": self.n_jobs,
+            "backend": self.backend,
+            "backend_params": self.backend_params,
+            "fold_ensemble": self.fold_ensemble,
+            "negative_pool": self.negative_pool,
+            "attribution": self.attribution,
+            "convergence_tolerance": self.convergence_tolerance,
+            "convergence_patience": self.convergence_patience,
+            "memory_limit": self.memory_limit,
+            "warm_start": self.warm_start,
+            "warm_start_rounds": self.warm_start_rounds,
+            "save_artifact": self.save_artifact,
+        }
 
     def validate(self) -> bool:
         attrs = {
             "runs": (int, lambda x: x >= 1),
             "folds": (int, lambda x: x >= 1),
             "xgb_params": (dict, None),
+            "n_jobs": ((int, type(None)), lambda x: x is None or x >= 1 or x == -1),
+            "backend": (str, lambda x: x in BACKENDS),
+            "backend_params": ((dict, type(None)), None),
+            "attribution": (bool, None),
+            "convergence_tolerance": (
+                (int, float, type(None)),
+                lambda x: x is None or x > 0,
+            ),
+            "convergence_patience": (int, lambda x: x >= 1),
+            "memory_limit": ((int, type(None)), lambda x: x is None or x >= 1),
+            "warm_start": ((str, type(None)), None),
+            "warm_start_rounds": (int, lambda x: x >= 1),
+            "save_artifact": (bool, None),
+            "fold_ensemble": (bool, None),
+            "negative_pool": (
+                (str, type(None)),
+                lambda x: x is None or x in NEGATIVE_POOL_MODES,
+            ),
         }
         for attr, (typ, cond) in attrs.items():
             value = getattr(self, attr, None)
@@ -95,7 +242,31 @@ class ModelConfig:
                 return False
             if cond and not cond(value):
                 return False
-        return True
+        return not (self.attribution and self.memory_limit is not None)
+
+
+@dataclass
+class RunResult:
+    """Result of one model run
+
+    Attributes:
+        run (int): index of the run
+        predictions (np.ndarray): predictions for the pairs to predict
+        auc (float): ROC AUC over the cross-validation folds
+        test_labels (np.ndarray): labels of the cross-validation test sets
+        test_predictions (np.ndarray): predictions for the cross-validation test sets
+        models (list[Any]): models whose mean prediction is the prediction of the run
+        contributions (np.ndarray | None): mean feature contributions of the run's models for the pairs to predict, if attribution is enabled
+
+    """
+
+    run: int
+    predictions: np.ndarray
+    auc: float
+    test_labels: np.ndarray
+    test_predictions: np.ndarray
+    models: list[Any]
+    contributions: np.ndarray | None = None
 
 
 class PrioritizationModel:
@@ -105,10 +276,15 @@ class PrioritizationModel:
     existing_pairs: set[Container[str]]
     model_config: ModelConfig
     n_features: int
-    gmts: list[list[set[str]]]
-    ppi_db: pl.DataFrame
+    gmts: list[list[set[str]]] | None
+    gene_set_index: GeneSetIndex
+    negative_sampler: NegativeSampler
+    feature_builder: FeatureBuilder
+    ppi_db: pl.DataFrame | None
+    ppi_index: PPIIndex
     default_ppi: bool
-    xgboost_model: xgboost.XGBClassifier
+    run_models: list[list[Any]]
+    aucs: list[float]
     pair_selector: PairSelector
 
     def __init__(
@@ -124,8 +300,8 @@ class PrioritizationModel:
         Args:
             dataset (XLDataSet): XL data set that needs prioritization. Requires Parsimony Analysis to have been performed.
             model_config (ModelConfig | None, optional): Config for the model. If None use defaults. Defaults to None.
-            gmt_list (list[list[set[str]]] | None, optional): list of exclusive sets. Negative pairs can't be in the same set. Defaults to None.
-            ppi_db (pl.DataFrame | None, optional): PPI database. Should have two columns P1 and P2, where P1 is first alphabetically. Defaults to None.
+            gmt_list (list[list[set[str]]] | None, optional): list of exclusive sets. Negative pairs can't be in the same set. If None, uses the default GMTs. Defaults to None.
+            ppi_db (pl.DataFrame | None, optional): PPI database. Should have two columns P1 and P2, where P1 is first alphabetically. If None, uses the default PPI index. Defaults to None.
             pair_selector (PairSelector,  optional): Pair selector
         """
         self.dataset = dataset
@@ -146,14 +322,114 @@ class PrioritizationModel:
         if model_config is None:
             model_config = ModelConfig()
         self.model_config = model_config
-        if gmt_list is None:
-            gmt_list = load_gmts()
         self.gmts = gmt_list
-        if ppi_db is None:
-            self.default_ppi = True
-            ppi_db = load_default_ppi()
+        if gmt_list is None:
+            self.gene_set_index = load_gene_set_index()
+        else:
+            self.gene_set_index = GeneSetIndex.from_gmts(gmt_list)
+        self.negative_sampler = NegativeSampler(
+            sorted(self.dataset.proteins),
+            self.existing_pairs,  # type: ignore
+            self.gene_set_index,
+        )
+        self.default_ppi = ppi_db is None
         self.ppi_db = ppi_db
+        if ppi_db is None:
+            self.ppi_index = load_default_ppi_index()
+        else:
+            self.ppi_index = PPIIndex.from_dataframe(ppi_db)
+        use_ppi = (
+            config.human_only or not self.default_ppi
+        )  # Can only add if only human or if using custom PPI DB
+        self.feature_builder = FeatureBuilder(
+            [self.dataset.proteins[p] for p in self.negative_sampler.protein_ids],
+            list(self.dataset.omic_data.keys()),
+            ppi_index=self.ppi_index if use_ppi else None,
+            uppercase=config.human_only,
+        )
         self.pair_selector = pair_selector
+        self.run_models = []
+        self.aucs = []
+
+    @classmethod
+    def from_artifact(
+        cls,
+        path: str | Path,
+        dataset: XLDataSet,
+        gmt_list: list[list[set[str]]] | None = None,
+        ppi_db: pl.DataFrame | None = None,
+        pair_selector: PairSelector | None = None,
+    ) -> "PrioritizationModel":
+        """Load a trained model to score a data set without retraining.
+
+        The model config is the one the models were trained with, except that the
+        run-time options `warm_start` and `save_artifact` are turned off, so running the
+        loaded model does not read or overwrite artifacts.
+
+        Args:
+            path (str | Path): directory of a model artifact saved by `save_model` or by `run_model` with `ModelConfig.save_artifact`
+            dataset (XLDataSet): XL data set that needs prioritization. Requires Parsimony Analysis to have been performed.
+            gmt_list (list[list[set[str]]] | None, optional): list of exclusive sets. Defaults to None.
+            ppi_db (pl.DataFrame | None, optional): PPI database. Should be the database the model was trained with. Defaults to None.
+            pair_selector (PairSelector | None, optional): Pair selector. If None, uses `BestSelector` without secondary pairs. Defaults to None.
+
+        Raises:
+            ValueError: Raised if the omics files of `dataset` do not match the features of the model
+
+        Returns:
+            PrioritizationModel: model with the trained models of the artifact
+
+        """
+        artifact = ModelArtifact.load(path)
+        model = cls(
+            dataset,
+            model_config=ModelConfig(
+                **(artifact.model_config | {"warm_start": None, "save_artifact": False})
+            ),
+            gmt_list=gmt_list,
+            ppi_db=ppi_db,
+            pair_selector=BestSelector(with_secondary=False)
+            if pair_selector is None
+            else pair_selector,
+        )
+        if set(artifact.omic_names) != set(dataset.omic_data.keys()):
+            raise ValueError(
+                f"Omics files {sorted(dataset.omic_data.keys())} do not match the omics files of the model {sorted(artifact.omic_names)}"
+            )
+        model.feature_builder = FeatureBuilder(
+            [dataset.proteins[p] for p in model.negative_sampler.protein_ids],
+            artifact.omic_names,
+            ppi_index=model.ppi_index if artifact.uses_ppi else None,
+            uppercase=artifact.uppercase,
+        )
+        if model.feature_builder.feature_names != artifact.feature_names:
+            raise ValueError(
+                f"Features {model.feature_builder.feature_names} do not match the features of the model {artifact.feature_names}"
+            )
+        model.run_models = artifact.run_models
+        return model
+
+    def artifact(self) -> ModelArtifact:
+        """Get the trained models and feature schema as a `ModelArtifact`.
+
+        Raises:
+            ValueError: Raised if the model has not been trained
+
+        Returns:
+            ModelArtifact: artifact of the trained models
+
+        """
+        if len(self.run_models) == 0:
+            raise ValueError("Model has not been trained. Run run_model first.")
+        return ModelArtifact(
+            feature_names=self.feature_builder.feature_names,
+            omic_names=self.feature_builder.omic_names,
+            uses_ppi=self.feature_builder.ppi_index is not None,
+            uppercase=config.human_only,
+            model_config=self.model_config.to_dict(),
+            run_models=self.run_models,
+            backend=self.model_config.backend,
+        )
 
     def is_intra(self, a: str, b: str) -> float:
         if config.human_only:  # Capitalize to ensure consistent case
@@ -179,20 +455,16 @@ class PrioritizationModel:
         if config.human_only:  # Capitalize to ensure consistent case
             a = a.upper()
             b = b.upper()
-        if a > b:
-            c = a
-            a = b
-            b = c
-        row_exists = self.ppi_db.filter(
-            (self.ppi_db["P1"] == a) & (self.ppi_db["P2"] == b)
-        )
-        return 1.0 if row_exists.height > 0 else 0.0
+        return 1.0 if self.ppi_index.contains(a, b) else 0.0
 
-    def get_negatives(self, n: int) -> list[ProteinPair]:
+    def get_negatives(
+        self, n: int, rng: np.random.Generator | None = None
+    ) -> list[ProteinPair]:
         """Get a list of negative protein pairs.
 
         Args:
             n (int): the number of pairs to generate
+            rng (np.random.Generator | None, optional): random number generator used for sampling. If None, seeded from `random`. Defaults to None.
 
         Raises:
             ValueError: Raised if the value of `n` is larger than what is possible
@@ -202,35 +474,63 @@ class PrioritizationModel:
             list[ProteinPair]: list of negative protein pairs
 
         """
-        negatives: list[ProteinPair] = []
-        n_prot = len(self.dataset.proteins.values())
-        if n > (n_prot * (n_prot - 1)) // 2 - len(self.positives):
-            msg = f"n value for get_negatives ({n}) is too large. Setting to maximum value: {(n_prot * (n_prot - 1)) // 2 - len(self.positives)}"
+        a_indices, b_indices = self.sample_negative_indices(n, rng)
+        protein_ids = self.negative_sampler.protein_ids
+        return [
+            ProteinPair(
+                self.dataset.proteins[protein_ids[a]],
+                self.dataset.proteins[protein_ids[b]],
+            )
+            for a, b in zip(a_indices, b_indices)
+        ]
+
+    def sample_negative_indices(
+        self, n: int, rng: np.random.Generator | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Sample negative protein pairs as indices into `negative_sampler.protein_ids`.
+
+        Args:
+            n (int): the number of pairs to generate
+            rng (np.random.Generator | None, optional): random number generator used for sampling. If None, seeded from `random`. Defaults to None.
+
+        Raises:
+            ValueError: Raised if the value of `n` is larger than what is possible
+                        and if config.fragile is True
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: protein indices of the first and second protein of each pair
+
+        """
+        n = self.negative_count(n)
+        if rng is None:
+            rng = np.random.default_rng(random.getrandbits(64))
+        return self.negative_sampler.sample(n, rng)
+
+    def negative_count(self, n: int) -> int:
+        """Cap a number of negative pairs at the number of possible negative pairs.
+
+        Args:
+            n (int): the number of pairs requested
+
+        Raises:
+            ValueError: Raised if the value of `n` is larger than what is possible
+                        and if config.fragile is True
+
+        Returns:
+            int: the number of pairs to sample
+
+        """
+        max_n = self.negative_sampler.max_pairs()
+        if n > max_n:
+            msg = f"n value for get_negatives ({n}) is too large. Setting to maximum value: {max_n}"
             if config.fragile:
                 logger.error(msg)
                 raise ValueError(
                     "get_negatives(n: int) n value is too large and fragile is True"
                 )
             logger.warning(msg)
-            n = (n_prot * (n_prot - 1)) // 2 - len(self.positives)
-        protein_ids = list(self.dataset.proteins.keys())
-
-        generated: set[Container[str]] = set()
-
-        while len(negatives) < n:
-            a, b = random.sample(protein_ids, 2)
-            pair_key = tuple(sorted([a, b]))
-            if (
-                pair_key in self.existing_pairs
-                or pair_key in generated
-                or in_same_set(a, b, self.gmts)
-            ):
-                continue
-            negatives.append(
-                ProteinPair(self.dataset.proteins[a], self.dataset.proteins[b])
-            )
-            generated.add(pair_key)
-        return negatives
+            n = max_n
+        return n
 
     def construct_df_from_pairs(
         self, pair_list: list[ProteinPair], has_label: bool, label_value: float = 0.0
@@ -246,27 +546,13 @@ class PrioritizationModel:
             pl.DataFrame: DataFrame object with the first column being the pair ID, following columns with abundances for the proteins. If `has_label` is true, last column is label with a value of `label_value`.
 
         """
-        df_array: list[dict[str, str | int | float | None]] = []
-        is_first = True
-        headers = ["pair"]  # headers in the correct order
-        schema: dict[str, pl.DataType] = {"pair": pl.String()}
-        for pair in pair_list:
-            pair_dict = pair.abundance_dict()
-            if (
-                config.human_only or not self.default_ppi
-            ):  # Can only add if only human or if using custom PPI DB
-                pair_dict["is_ppi"] = self.is_ppi(pair.a.name, pair.b.name)
-                # pair_dict["is_intra"] = self.is_intra(pair.a.name, pair.b.name)
-            if has_label:
-                pair_dict["label"] = label_value
-            df_array.append(pair_dict)
-            if is_first:
-                is_first = False
-                for header in pair_dict.keys():
-                    if "pair" != header:
-                        headers.append(header)
-                        schema[header] = pl.Float64()
-        return pl.DataFrame(df_array, schema=pl.Schema(schema)).select(headers)
+        features = self.feature_builder.build_from_pairs(pair_list, dtype=np.float64)
+        df = self.feature_builder.to_dataframe(
+            [pair.pair_id for pair in pair_list], features
+        )
+        if has_label:
+            df = df.with_columns(pl.lit(label_value, dtype=pl.Float64).alias("label"))
+        return df
 
     def construct_predict_df(self) -> pl.DataFrame:
         return self.construct_df_from_pairs(self.to_predict, has_label=False)
@@ -289,79 +575,550 @@ class PrioritizationModel:
         )
         return pl.concat([positive_df, negative_df])
 
-    def run_model(self):
-        """Run the model and get predictions for all protein pairs."""
+    @cached_property
+    def positive_X(self) -> np.ndarray:
+        """Feature matrix of the positive pairs, built once per model."""
+        return self.feature_builder.build_from_pairs(self.positives)
+
+    @cached_property
+    def predict_X(self) -> np.ndarray:
+        """Feature matrix of the pairs to predict, built once per model."""
+        return self.feature_builder.build_from_pairs(self.to_predict)
+
+    @cached_property
+    def positive_indices(self) -> tuple[np.ndarray, np.ndarray]:
+        """Protein indices of the positive pairs."""
+        return self.feature_builder.pair_indices(self.positives)
+
+    @cached_property
+    def predict_indices(self) -> tuple[np.ndarray, np.ndarray]:
+        """Protein indices of the pairs to predict."""
+        return self.feature_builder.pair_indices(self.to_predict)
+
+    def batch_rows(self) -> int:
+        """Rows per feature batch under `ModelConfig.memory_limit`."""
+        assert self.model_config.memory_limit is not None
+        return batch_rows(
+            self.model_config.memory_limit, self.feature_builder.n_features
+        )
 
-        random_seed = random.random() * 100000
+    def feature_batches(
+        self, pairs: list[ProteinPair] | None = None
+    ) -> Iterator[tuple[slice, np.ndarray]]:
+        """Get the feature matrix of pairs in batches.
 
-        predict_df = self.construct_predict_df()
+        Without `ModelConfig.memory_limit` there is a single batch.
 
-        predict_X = predict_df.drop("pair").to_numpy()
+        Args:
+            pairs (list[ProteinPair] | None, optional): pairs of proteins in the data set of the model. If None, uses the pairs to predict. Defaults to None.
 
-        predictions = np.zeros((self.model_config.runs, len(self.to_predict)))
+        Yields:
+            tuple[slice, np.ndarray]: rows of the batch and their features
 
-        # Lists to store data for Shapley values and AUC plots
-        all_test_labels = []
-        all_test_preds = []
-        run_ids = []
-        aucs = []
+        """
+        if self.model_config.memory_limit is None:
+            if pairs is None:
+                yield slice(0, len(self.to_predict)), self.predict_X
+            else:
+                yield slice(0, len(pairs)), self.feature_builder.build_from_pairs(pairs)
+            return
+        if pairs is None:
+            a_indices, b_indices = self.predict_indices
+        else:
+            a_indices, b_indices = self.feature_builder.pair_indices(pairs)
+        yield from iter_batches(
+            self.feature_builder, a_indices, b_indices, self.batch_rows()
+        )
+
+    def build_negative_pool(self, mode: str, seed: int) -> NegativePool:
+        """Sample and featurize the negatives of all runs at once.
+
+        The pool holds `runs` negatives per positive, capped by the number of possible
+        negative pairs. Runs share negatives if the pool is capped.
+
+        Args:
+            mode (str): "disjoint" or "subsample"
+            seed (int): seed used to sample the pool
+
+        Raises:
+            ValueError: Raised if there are fewer possible negative pairs than positives
+                        and if config.fragile is True
+
+        Returns:
+            NegativePool: pool shared by all runs
+
+        """
+        n_positives = self.negative_count(len(self.positives))
+        n = min(self.model_config.runs * n_positives, self.negative_sampler.max_pairs())
+        a_indices, b_indices = self.negative_sampler.sample(
+            n, np.random.default_rng(seed)
+        )
+        logger.info(
+            f"Sampled a pool of {len(a_indices)} negative pairs for {self.model_config.runs} runs"
+        )
+        return NegativePool(
+            self.feature_builder.build(a_indices, b_indices),
+            mode,
+            self.model_config.runs,
+            n_positives,
+        )
+
+    def run_training_data(
+        self,
+        run: int,
+        run_seed: float,
+        buffer: TrainingBuffer,
+        negative_pool: NegativePool | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get the training matrix of a run, with negatives drawn from the run's seed.
+
+        Args:
+            run (int): index of the run
+            run_seed (float): seed of the run
+            buffer (TrainingBuffer): training matrix holding the positive pairs
+            negative_pool (NegativePool | None, optional): pool to take the negatives from. If None, negatives are sampled for the run. Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: views of the features and labels in `buffer`
 
-        for run in range(self.model_config.runs):
-            logger.info(f"Model on run {run + 1}/{self.model_config.runs}")
-            np.random.seed(int(random_seed + run))
-            train_df = self.construct_training_df(
-                self.get_negatives(len(self.positives))
+        """
+        rng = np.random.default_rng(int(run_seed + run))
+        if negative_pool is None:
+            return buffer.with_negatives(
+                self.feature_builder,
+                *self.sample_negative_indices(len(self.positives), rng),
             )
+        return buffer.with_negative_rows(
+            negative_pool.features, negative_pool.run_indices(run, rng)
+        )
+
+    def train_run(
+        self,
+        run: int,
+        run_seed: float,
+        final_seed: float,
+        buffer: TrainingBuffer,
+        predict_X: np.ndarray,
+        n_threads: int | None = None,
+        negative_pool: NegativePool | None = None,
+    ) -> RunResult:
+        """Train and evaluate the models of a single run.
+
+        Args:
+            run (int): index of the run
+            run_seed (float): seed for the negatives, folds, and fold models of the run
+            final_seed (float): seed of the model trained on all data. Not used with `ModelConfig.fold_ensemble`.
+            buffer (TrainingBuffer): training matrix holding the positive pairs. Not shared with concurrent runs.
+            predict_X (np.ndarray): feature matrix of the pairs to predict
+            n_threads (int | None, optional): number of threads per model. If None, the backend decides. Defaults to None.
+            negative_pool (NegativePool | None, optional): pool to take the negatives from. If None, negatives are sampled for the run. Defaults to None.
+
+        Returns:
+            RunResult: predictions and cross-validation results of the run
+
+        """
+        logger.info(f"Model on run {run + 1}/{self.model_config.runs}")
+        X, y = self.run_training_data(run, run_seed, buffer, negative_pool)
+
+        skf = StratifiedKFold(
+            n_splits=self.model_config.folds,
+            shuffle=True,
+            random_state=(int(run_seed + run)),
+        )
+
+        y_test_run = np.array([])
+        y_test_pred_run = np.array([])
+
+        fold_ensemble = self.model_config.fold_ensemble
+        run_predictions = np.zeros(len(predict_X))
+        models = []
+        backend = self.model_config.create_backend(n_threads)
+        backend.start_run(X, y)
+
+        # Run k-fold cross-validation
+        for fold, (train_idx, test_idx) in enumerate(skf.split(X, y)):
+            model = backend.fit(train_idx, int(run_seed + run * fold))
 
-            X = train_df.drop(["pair", "label"]).to_numpy()
-            y = train_df.get_column("label").to_numpy()
+            y_test_pred = backend.predict(model, X[test_idx])
+            if fold_ensemble:
+                run_predictions += backend.predict(model, predict_X)
+                models.append(model)
 
-            skf = StratifiedKFold(
-                n_splits=self.model_config.folds,
-                shuffle=True,
-                random_state=(int(random_seed + run)),
+            y_test_run = np.append(y_test_run, y[test_idx])
+            y_test_pred_run = np.append(y_test_pred_run, y_test_pred)
+
+        if fold_ensemble:
+            run_predictions /= self.model_config.folds  # mean of the fold models
+        else:
+            # Train a model on the entire dataset for predictions
+            model = backend.fit(None, int(final_seed))
+            run_predictions = backend.predict(model, predict_X)
+            models.append(model)
+
+        contributions = None
+        if self.model_config.attribution and backend.supports_contributions:
+            contributions = np.mean(
+                [backend.contributions(model, predict_X) for model in models], axis=0
             )
 
-            y_test_run = np.array([])
-            y_test_pred_run = np.array([])
+        auc_score = roc_auc_score(y_test_run, y_test_pred_run)
+        logger.info(f"ROC AUC for run {run + 1}: {auc_score:.2f}")
+        return RunResult(
+            run=run,
+            predictions=run_predictions,
+            auc=float(auc_score),
+            test_labels=y_test_run,
+            test_predictions=y_test_pred_run,
+            models=models,
+            contributions=contributions,
+        )
+
+    def warm_start_run(
+        self,
+        run: int,
+        run_seed: float,
+        saved_models: list[Any],
+        buffer: TrainingBuffer,
+        predict_X: np.ndarray,
+        n_threads: int | None = None,
+        negative_pool: NegativePool | None = None,
+    ) -> RunResult:
+        """Continue boosting the saved models of a run on a newly sampled training matrix.
+
+        No cross-validation is done, so the AUC of the run is NaN.
 
-            # Run k-fold cross-validation
-            for fold, (train_idx, test_idx) in enumerate(skf.split(X, y)):
-                # Split data
-                X_train, X_test = X[train_idx], X[test_idx]
-                y_train, y_test = y[train_idx], y[test_idx]
+        Args:
+            run (int): index of the run
+            run_seed (float): seed for the negatives and added rounds of the run
+            saved_models (list[Any]): models of the run in the warm start artifact. Not modified.
+            buffer (TrainingBuffer): training matrix holding the positive pairs. Not shared with concurrent runs.
+            predict_X (np.ndarray): feature matrix of the pairs to predict
+            n_threads (int | None, optional): number of threads per model. If None, the backend decides. Defaults to None.
+            negative_pool (NegativePool | None, optional): pool to take the negatives from. If None, negatives are sampled for the run. Defaults to None.
 
-                model = xgboost.XGBClassifier(
-                    **self.model_config.xgb_params,
-                    random_state=int(random_seed + run * fold),
-                )
+        Returns:
+            RunResult: predictions and updated models of the run
+
+        """
+        logger.info(f"Warm start of run {run + 1}")
+        X, y = self.run_training_data(run, run_seed, buffer, negative_pool)
+        backend = self.model_config.create_backend(n_threads)
+        backend.start_run(X, y)
+        models = [
+            backend.continue_fit(
+                model,
+                None,
+                int(run_seed + run * i),
+                self.model_config.warm_start_rounds,
+            )
+            for i, model in enumerate(saved_models)
+        ]
+        run_predictions = np.mean(
+            [backend.predict(model, predict_X) for model in models], axis=0
+        )
+
+        contributions = None
+        if self.model_config.attribution and backend.supports_contributions:
+            contributions = np.mean(
+                [backend.contributions(model, predict_X) for model in models], axis=0
+            )
+
+        return RunResult(
+            run=run,
+            predictions=run_predictions,
+            auc=float("nan"),
+            test_labels=np.array([]),
+            test_predictions=np.array([]),
+            models=models,
+            contributions=contributions,
+        )
+
+    def load_warm_start(self, path: str | Path) -> list[list[Any]]:
+        """Load the run models of an artifact to continue training them.
+
+        Args:
+            path (str | Path): directory of a model artifact saved by `save_model` or by `run_model` with `ModelConfig.save_artifact`
+
+        Raises:
+            ValueError: Raised if the backends do not support warm starts, `ModelConfig.memory_limit` is set, or the features of the artifact do not match
+
+        Returns:
+            list[list[Any]]: saved models of each run
+
+        """
+        backend = get_backend(self.model_config.backend)
+        if not backend.supports_warm_start:
+            raise ValueError(
+                f"{self.model_config.backend} backend does not support warm starts"
+            )
+        if self.model_config.memory_limit is not None:
+            raise ValueError("warm_start can not be combined with memory_limit")
+        artifact = ModelArtifact.load(path)
+        if not get_backend(artifact.backend).supports_warm_start:
+            raise ValueError(
+                f"Models of the {artifact.backend} backend can not be warm started"
+            )
+        if artifact.feature_names != self.feature_builder.feature_names:
+            raise ValueError(
+                f"Features {self.feature_builder.feature_names} do not match the features of the model {artifact.feature_names}"
+            )
+        logger.info(
+            f"Warm starting {len(artifact.run_models)} runs from {path} with {self.model_config.warm_start_rounds} added rounds"
+        )
+        return artifact.run_models
 
-                _ = model.fit(X_train, y_train)
+    def train_run_external(
+        self,
+        run: int,
+        run_seed: float,
+        final_seed: float,
+        n_threads: int | None = None,
+    ) -> RunResult:
+        """Train and evaluate the models of a single run with XGBoost external memory.
+
+        Gives the same negatives and folds as `train_run`. Features are built in batches
+        of at most `batch_rows` rows whenever XGBoost or a prediction needs them.
+
+        Args:
+            run (int): index of the run
+            run_seed (float): seed for the negatives, folds, and fold models of the run
+            final_seed (float): seed of the model trained on all data. Not used with `ModelConfig.fold_ensemble`.
+            n_threads (int | None, optional): number of threads per model. If None, XGBoost decides. Defaults to None.
+
+        Returns:
+            RunResult: predictions and cross-validation results of the run
+
+        """
+        logger.info(
+            f"Model on run {run + 1}/{self.model_config.runs} (external memory)"
+        )
+        rng = np.random.default_rng(int(run_seed + run))
+        negative_a, negative_b = self.sample_negative_indices(len(self.positives), rng)
+        positive_a, positive_b = self.positive_indices
+        a_indices = np.concatenate([positive_a, negative_a])
+        b_indices = np.concatenate([positive_b, negative_b])
+        y = np.zeros(len(a_indices))
+        y[: len(positive_a)] = 1.0
+
+        skf = StratifiedKFold(
+            n_splits=self.model_config.folds,
+            shuffle=True,
+            random_state=(int(run_seed + run)),
+        )
 
-                y_test_pred = model.predict_proba(X_test)[:, 1]
+        rows = self.batch_rows()
+        fold_ensemble = self.model_config.fold_ensemble
+        backend = self.model_config.create_backend(n_threads)
+        xgb_params = dict(self.model_config.xgb_params)
+        if n_threads is not None:
+            xgb_params["n_jobs"] = n_threads
+
+        def predict(model: Any, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+            predictions = np.empty(len(a))
+            for batch, X in iter_batches(self.feature_builder, a, b, rows):
+                predictions[batch] = backend.predict(model, X)
+            return predictions
+
+        y_test_run = np.array([])
+        y_test_pred_run = np.array([])
+        run_predictions = np.zeros(len(self.to_predict))
+        models = []
+
+        with tempfile.TemporaryDirectory(prefix="xlranker-") as cache_dir:
+            # folds only depend on the labels, so they match the in-memory path
+            for fold, (train_idx, test_idx) in enumerate(skf.split(a_indices, y)):
+                params, num_boost_round = booster_params(
+                    xgb_params, int(run_seed + run * fold)
+                )
+                model = train_external(
+                    params,
+                    num_boost_round,
+                    self.feature_builder,
+                    a_indices[train_idx],
+                    b_indices[train_idx],
+                    y[train_idx],
+                    rows,
+                    Path(cache_dir) / f"fold_{fold}",
+                    n_threads,
+                )
+                y_test_pred = predict(model, a_indices[test_idx], b_indices[test_idx])
+                if fold_ensemble:
+                    run_predictions += predict(model, *self.predict_indices)
+                    models.append(model)
 
-                y_test_run = np.append(y_test_run, y_test)
+                y_test_run = np.append(y_test_run, y[test_idx])
                 y_test_pred_run = np.append(y_test_pred_run, y_test_pred)
 
-            # Train a model on the entire dataset for predictions
-            random_seed = random.random() * 100000
-            model = xgboost.XGBClassifier(
-                **self.model_config.xgb_params, random_state=int(random_seed)
+            if fold_ensemble:
+                run_predictions /= self.model_config.folds  # mean of the fold models
+            else:
+                params, num_boost_round = booster_params(xgb_params, int(final_seed))
+                model = train_external(
+                    params,
+                    num_boost_round,
+                    self.feature_builder,
+                    a_indices,
+                    b_indices,
+                    y,
+                    rows,
+                    Path(cache_dir) / "final",
+                    n_threads,
+                )
+                run_predictions = predict(model, *self.predict_indices)
+                models.append(model)
+
+        auc_score = roc_auc_score(y_test_run, y_test_pred_run)
+        logger.info(f"ROC AUC for run {run + 1}: {auc_score:.2f}")
+        return RunResult(
+            run=run,
+            predictions=run_predictions,
+            auc=float(auc_score),
+            test_labels=y_test_run,
+            test_predictions=y_test_pred_run,
+            models=models,
+        )
+
+    def run_model(self):
+        """Run the model and get predictions for all protein pairs.
+
+        Runs are independent apart from their seeds. If `ModelConfig.n_jobs` is set,
+        runs are trained concurrently and give the same results as sequential runs.
+        If `ModelConfig.convergence_tolerance` is set, runs stop early once the mean
+        predictions have converged. If `ModelConfig.warm_start` is set, the saved runs
+        are trained further instead and the drift of the predictions is logged.
+
+        Raises:
+            ValueError: Raised if `ModelConfig.memory_limit` is set for a backend other than XGBoost or together with `ModelConfig.attribution`, or the warm start artifact can not be used
+        """
+        external = self.model_config.memory_limit is not None
+        if external and not issubclass(
+            get_backend(self.model_config.backend), XGBoostBackend
+        ):
+            raise ValueError(
+                f"memory_limit requires an XGBoost backend, got {self.model_config.backend}"
+            )
+        if external and self.model_config.attribution:
+            raise ValueError("attribution can not be combined with memory_limit")
+        warm_models = None
+        previous_predictions = np.empty(0)
+        if self.model_config.warm_start is not None:
+            warm_models = self.load_warm_start(self.model_config.warm_start)
+            previous_predictions = self.mean_prediction(warm_models)
+        n_runs = self.model_config.runs if warm_models is None else len(warm_models)
+
+        # seed of each run, followed by the seed of the run's final model
+        run_seeds = [random.random() * 100000 for _ in range(n_runs + 1)]
+
+        negative_pool = None
+        if external and self.model_config.negative_pool is not None:
+            logger.warning(
+                "A negative pool does not fit a memory limit. Sampling negatives per run."
+            )
+        elif self.model_config.negative_pool is not None:
+            negative_pool = self.build_negative_pool(
+                self.model_config.negative_pool, random.getrandbits(64)
+            )
+        predictions = PredictionAccumulator(len(self.to_predict))
+        self.run_models = []
+
+        # Lists to store data for Shapley values and AUC plots
+        all_test_labels = []
+        all_test_preds = []
+        run_ids = []
+        self.aucs = []
+
+        concurrent_runs, n_threads = self.model_config.thread_plan()
+        if concurrent_runs > 1:
+            logger.info(
+                f"Training {concurrent_runs} runs concurrently with {n_threads} thread(s) each"
             )
-            model.fit(X, y)
 
-            # Get predictions for the prediction dataset
-            cur_predictions = model.predict_proba(predict_X)[:, 1]
-            predictions[run] = cur_predictions
+        buffers = threading.local()  # one training buffer per worker thread
 
-            auc_score = roc_auc_score(y_test_run, y_test_pred_run)
-            aucs.append(auc_score)
-            logger.info(f"ROC AUC for run {run + 1}: {auc_score:.2f}")
-            all_test_labels.append(y_test_run)
-            all_test_preds.append(y_test_pred_run)
-            run_ids.append(run)
+        def train(run: int) -> RunResult:
+            if external:
+                return self.train_run_external(
+                    run, run_seeds[run], run_seeds[run + 1], n_threads=n_threads
+                )
+            if not hasattr(buffers, "buffer"):
+                buffers.buffer = TrainingBuffer(self.positive_X, len(self.positives))
+            if warm_models is not None:
+                return self.warm_start_run(
+                    run,
+                    run_seeds[run],
+                    warm_models[run],
+                    buffers.buffer,
+                    self.predict_X,
+                    n_threads=n_threads,
+                    negative_pool=negative_pool,
+                )
+            return self.train_run(
+                run,
+                run_seeds[run],
+                run_seeds[run + 1],
+                buffers.buffer,
+                self.predict_X,
+                n_threads=n_threads,
+                negative_pool=negative_pool,
+            )
+
+        attribution = self.model_config.attribution
+        if (
+            attribution
+            and not self.model_config.create_backend().supports_contributions
+        ):
+            logger.warning(
+                f"Feature attribution is not supported by the {self.model_config.backend} backend. Skipping."
+            )
+            attribution = False
+        # running sum of the contributions, so runs are not kept in memory
+        contribution_sum = None
+
+        monitor = None
+        if (
+            self.model_config.convergence_tolerance is not None
+            and warm_models is not None
+        ):
+            logger.warning(
+                "Convergence early stopping is not used with a warm start. Continuing all saved runs."
+            )
+        elif self.model_config.convergence_tolerance is not None:
+            monitor = ConvergenceMonitor(
+                self.model_config.convergence_tolerance,
+                self.model_config.convergence_patience,
+            )
 
-        mean_predictions = np.mean(predictions, axis=0)
+        with ThreadPoolExecutor(max_workers=concurrent_runs) as executor:
+            # results are used in run order, so stopping early does not depend on timing
+            pending = deque(
+                executor.submit(train, run)
+                for run in range(min(concurrent_runs, n_runs))
+            )
+            next_run = len(pending)
+            while pending:
+                result = pending.popleft().result()
+                predictions.add(result.predictions)
+                self.aucs.append(result.auc)
+                all_test_labels.append(result.test_labels)
+                all_test_preds.append(result.test_predictions)
+                run_ids.append(result.run)
+                self.run_models.append(result.models)
+                if attribution and result.contributions is not None:
+                    if contribution_sum is None:
+                        contribution_sum = np.zeros_like(result.contributions)
+                    contribution_sum += result.contributions
+                if monitor is not None and monitor.update(predictions.mean):
+                    for future in pending:
+                        future.cancel()
+                    logger.info(
+                        f"Mean predictions converged after {predictions.count} runs (max change {monitor.last_delta:.2e}). Saved {n_runs - predictions.count} of {n_runs} runs."
+                    )
+                    break
+                if next_run < n_runs:
+                    pending.append(executor.submit(train, next_run))
+                    next_run += 1
+
+        mean_predictions = predictions.mean
 
         for i, protein_pair in enumerate(self.to_predict):
             protein_pair.set_score(mean_predictions[i])
@@ -370,16 +1127,154 @@ class PrioritizationModel:
             config.output, exist_ok=True
         )  # TODO: Have this done automatically or ask if its okay if exists.
 
-        predict_df = predict_df.with_columns(pl.Series("prediction", mean_predictions))
-        predict_df.write_csv(
-            str(Path(config.output).joinpath("model_output.tsv")), separator="\t"
+        self.write_predictions(
+            mean_predictions, predictions.std(), predictions.agreement()
         )
+        if contribution_sum is not None:
+            self.write_attribution(contribution_sum / predictions.count)
+        if self.model_config.save_artifact:
+            self.save_model(str(Path(config.output).joinpath(ARTIFACT_DIR)))
 
         # Print summary statistics
+        if warm_models is not None:
+            drift = np.abs(mean_predictions - previous_predictions)
+            changed_calls = np.count_nonzero(
+                (mean_predictions >= AGREEMENT_THRESHOLD)
+                != (previous_predictions >= AGREEMENT_THRESHOLD)
+            )
+            logger.info(
+                f"Warm start changed predictions by {drift.mean():.4f} on average (max {drift.max():.4f}). {changed_calls} of {len(drift)} pairs changed their call."
+            )
+        else:
+            logger.info(
+                f"Average AUC across {predictions.count} runs: {np.mean(self.aucs):.4f} ± {np.std(self.aucs):.4f}"
+            )
+        logger.info("Results saved to: .")  # TODO Have output directory be configurable
+
+    def tune(
+        self,
+        time_budget: float = 300.0,
+        param_grid: dict[str, list[Any]] | None = None,
+        max_candidates: int | None = 27,
+        min_rounds: int = 25,
+        max_rounds: int = 300,
+        reduction_factor: int = 3,
+    ) -> TuningResult:
+        """Tune the XGBoost parameters by successive halving and update `model_config`.
+
+        Candidates are scored by cross-validation AUC on one seeded set of negatives, using
+        the cached positive features and the same folds for every candidate. Candidates
+        run concurrently according to `ModelConfig.n_jobs`.
+
+        Args:
+            time_budget (float, optional): seconds after which no new evaluations are started. Defaults to 300.0.
+            param_grid (dict[str, list[Any]] | None, optional): values to try for every parameter. If None, uses DEFAULT_PARAM_GRID. Defaults to None.
+            max_candidates (int | None, optional): if the grid is larger, a random subset of this size is tried. Defaults to 27.
+            min_rounds (int, optional): boosting rounds of the first rung. Defaults to 25.
+            max_rounds (int, optional): most boosting rounds of any candidate. Defaults to 300.
+            reduction_factor (int, optional): fraction of candidates kept and growth of rounds per rung. Defaults to 3.
+
+        Returns:
+            TuningResult: best parameters found. These are also set as the xgb_params of `model_config`, unless no candidate finished within the budget.
+
+        """
+        if param_grid is None:
+            param_grid = DEFAULT_PARAM_GRID
+        seed = random.getrandbits(32)
+        buffer = TrainingBuffer(self.positive_X, len(self.positives))
+        X, y = buffer.with_negatives(
+            self.feature_builder,
+            *self.sample_negative_indices(
+                len(self.positives), np.random.default_rng(seed)
+            ),
+        )
+        folds = list(
+            StratifiedKFold(
+                n_splits=self.model_config.folds, shuffle=True, random_state=seed
+            ).split(X, y)
+        )
+        concurrent, n_threads = self.model_config.thread_plan()
+        candidates = expand_grid(param_grid, max_candidates)
         logger.info(
-            f"Average AUC across {self.model_config.runs} runs: {np.mean(aucs):.4f} ± {np.std(aucs):.4f}"
+            f"Tuning {len(candidates)} parameter candidates within {time_budget} seconds"
+        )
+        search = SuccessiveHalving(
+            X,
+            y,
+            folds,
+            self.model_config.xgb_params,
+            concurrent=max(1, min(concurrent, len(candidates))),
+            n_threads=n_threads,
+            seed=seed,
+        )
+        result = search.run(
+            candidates,
+            time_budget,
+            min_rounds=min_rounds,
+            max_rounds=max_rounds,
+            reduction_factor=reduction_factor,
+        )
+        if len(result.history) == 0:
+            return result  # no candidate finished, keep the current parameters
+        logger.info(
+            f"Best parameters with AUC {result.score:.4f} after {result.seconds:.1f} seconds: {result.params}"
+        )
+        self.model_config.xgb_params = result.params
+        return result
+
+    def write_predictions(
+        self, mean: np.ndarray, std: np.ndarray, agreement: np.ndarray
+    ) -> None:
+        """Write the features and predictions of the pairs to predict to model_output.tsv.
+
+        Written batch by batch, so the feature matrix is not held in memory under
+        `ModelConfig.memory_limit`. Features are written in float64, the precision of
+        the abundances, not in the float32 the models are trained on.
+
+        Args:
+            mean (np.ndarray): mean prediction over runs
+            std (np.ndarray): standard deviation of the predictions over runs
+            agreement (np.ndarray): fraction of runs that agree with the majority call
+
+        """
+        pair_ids = [pair.pair_id for pair in self.to_predict]
+        rows = (
+            len(pair_ids)
+            if self.model_config.memory_limit is None
+            else self.batch_rows()
+        )
+        batches = iter_batches(
+            self.feature_builder, *self.predict_indices, max(1, rows), np.float64
+        )
+        # binary, so line endings are "\n" on every platform like a write by path
+        with open(Path(config.output).joinpath("model_output.tsv"), "wb") as w:
+            for i, (batch, X) in enumerate(batches):
+                predict_df = self.feature_builder.to_dataframe(
+                    pair_ids[batch], X
+                ).with_columns(
+                    pl.Series("prediction", mean[batch]),
+                    pl.Series("prediction_std", std[batch]),
+                    pl.Series("run_agreement", agreement[batch]),
+                )
+                predict_df.write_csv(w, separator="\t", include_header=i == 0)
+
+    def write_attribution(self, contributions: np.ndarray) -> None:
+        """Write feature contributions of the pairs to predict to feature_attribution.tsv.
+
+        Args:
+            contributions (np.ndarray): array of shape (pairs, features + 1) with the bias in the last column
+
+        """
+        columns = self.feature_builder.feature_names + ["bias"]
+        attribution_df = pl.DataFrame(
+            {"pair": [pair.pair_id for pair in self.to_predict]}
+            | {name: contributions[:, i] for i, name in enumerate(columns)}
+        )
+        attribution_df.write_csv(
+            str(Path(config.output).joinpath("feature_attribution.tsv")),
+            separator="\t",
+            float_precision=6,
         )
-        logger.info("Results saved to: .")  # TODO Have output directory be configurable
 
     def get_selected(self) -> list[ProteinPair]:
         """Get all `ProteinPair`s that were accepted
@@ -405,5 +1300,58 @@ class PrioritizationModel:
         self.pair_selector.process(self.to_predict)
         return self.get_selected()
 
+    def predict_pairs(self, pairs: list[ProteinPair] | None = None) -> np.ndarray:
+        """Score protein pairs with the trained models and set their scores.
+
+        Args:
+            pairs (list[ProteinPair] | None, optional): pairs of proteins in the data set of the model. If None, scores the pairs to predict. Defaults to None.
+
+        Raises:
+            ValueError: Raised if the model has not been trained
+
+        Returns:
+            np.ndarray: mean prediction over all runs for each pair
+
+        """
+        if len(self.run_models) == 0:
+            raise ValueError("Model has not been trained. Run run_model first.")
+        predictions = self.mean_prediction(self.run_models, pairs)
+        if pairs is None:
+            pairs = self.to_predict
+        for i, protein_pair in enumerate(pairs):
+            protein_pair.set_score(predictions[i])
+        return predictions
+
+    def mean_prediction(
+        self, run_models: list[list[Any]], pairs: list[ProteinPair] | None = None
+    ) -> np.ndarray:
+        """Get the mean prediction of run models without setting scores.
+
+        Args:
+            run_models (list[list[Any]]): models of each run
+            pairs (list[ProteinPair] | None, optional): pairs of proteins in the data set of the model. If None, uses the pairs to predict. Defaults to None.
+
+        Returns:
+            np.ndarray: mean prediction over all runs for each pair
+
+        """
+        backend = self.model_config.create_backend()
+        n_pairs = len(self.to_predict if pairs is None else pairs)
+        predictions = np.zeros(n_pairs)
+        for batch, X in self.feature_batches(pairs):
+            for models in run_models:
+                run_predictions = np.zeros(len(X))
+                for model in models:
+                    run_predictions += backend.predict(model, X)
+                predictions[batch] += run_predictions / len(models)
+        predictions /= len(run_models)
+        return predictions
+
     def save_model(self, file_path: str) -> None:
-        self.xgboost_model.save_model(file_path)
+        """Save the trained models of all runs as a model artifact.
+
+        Args:
+            file_path (str): directory to save the artifact to
+
+        """
+        self.artifact().save(file_path)
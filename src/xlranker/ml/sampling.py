@@ -0,0 +1,234 @@
+"""Negative pair sampling for the prioritization model."""
+
+import logging
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from xlranker.util.gene_sets import GeneSetIndex
+
+logger = logging.getLogger(__name__)
+
+MIN_BATCH_SIZE = 1024
+# enumerate the complement if n is at least this fraction of the maximum
+ENUMERATE_FRACTION = 0.5
+MIN_ACCEPTANCE = 0.01  # enumerate the complement if fewer candidates are accepted
+ENUMERATE_CHUNK_SIZE = 1 << 20  # candidate pairs checked at a time while enumerating
+NEGATIVE_POOL_MODES = ("disjoint", "subsample")
+
+
+class NegativeSampler:
+    """Draws random protein pairs that are not in the network and share no gene set.
+
+    Candidates are drawn as integer index pairs in large batches and filtered vectorized.
+    When the requested number of pairs approaches the number of possible pairs, or almost
+    all candidates are rejected, all valid pairs are enumerated and sampled directly.
+
+    Attributes:
+        protein_ids (list[str]): ids of the proteins that can be sampled. The position of an id is its index.
+        existing_keys (np.ndarray): sorted int64 keys of the pairs that are already in the network
+        gene_set_index (GeneSetIndex): index used to reject pairs that share a gene set
+        gene_set_codes (np.ndarray): gene set index code of each protein
+
+    """
+
+    protein_ids: list[str]
+    existing_keys: np.ndarray
+    gene_set_index: GeneSetIndex
+    gene_set_codes: np.ndarray
+
+    def __init__(
+        self,
+        protein_ids: Sequence[str],
+        existing_pairs: Iterable[tuple[str, str]],
+        gene_set_index: GeneSetIndex,
+    ):
+        """Initialize the NegativeSampler
+
+        Args:
+            protein_ids (Sequence[str]): ids of the proteins that can be sampled
+            existing_pairs (Iterable[tuple[str, str]]): protein id pairs that can't be sampled
+            gene_set_index (GeneSetIndex): index used to reject pairs that share a gene set
+
+        """
+        self.protein_ids = list(protein_ids)
+        index = {protein: i for i, protein in enumerate(self.protein_ids)}
+        existing = [
+            (index[a], index[b])
+            for a, b in existing_pairs
+            if a != b and a in index and b in index
+        ]
+        existing_codes = np.array(existing, dtype=np.int64).reshape(-1, 2)
+        self.existing_keys = np.unique(
+            self.pair_keys(existing_codes[:, 0], existing_codes[:, 1])
+        )
+        self.gene_set_index = gene_set_index
+        self.gene_set_codes = gene_set_index.encode(self.protein_ids)
+
+    @property
+    def n_proteins(self) -> int:
+        return len(self.protein_ids)
+
+    def max_pairs(self) -> int:
+        """Upper bound on the number of negative pairs, not counting gene set rejections."""
+        return self.n_proteins * (self.n_proteins - 1) // 2 - len(self.existing_keys)
+
+    def pair_keys(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.minimum(a, b) * self.n_proteins + np.maximum(a, b)
+
+    def is_valid(self, keys: np.ndarray) -> np.ndarray:
+        """Check which pair keys are not in the network and share no gene set."""
+        valid = ~np.isin(keys, self.existing_keys, assume_unique=False)
+        a = keys // self.n_proteins
+        b = keys % self.n_proteins
+        valid &= ~self.gene_set_index.share_set_codes(
+            self.gene_set_codes[a], self.gene_set_codes[b]
+        )
+        return valid
+
+    def enumerate_valid(self) -> np.ndarray:
+        """Get the keys of all valid negative pairs, checking a block of rows at a time."""
+        valid_keys: list[np.ndarray] = [np.empty(0, dtype=np.int64)]
+        n = self.n_proteins
+        rows_per_chunk = max(1, ENUMERATE_CHUNK_SIZE // max(n, 1))
+        for start in range(0, n - 1, rows_per_chunk):
+            a = np.arange(start, min(start + rows_per_chunk, n - 1), dtype=np.int64)
+            a = np.repeat(a, n - 1 - a)
+            b = np.arange(len(a), dtype=np.int64)
+            row_starts = np.flatnonzero(np.r_[True, a[1:] != a[:-1]])
+            b -= np.repeat(row_starts, np.diff(np.r_[row_starts, len(a)]))
+            b += a + 1  # b runs from a + 1 to n - 1 within each row
+            keys = self.pair_keys(a, b)
+            valid_keys.append(keys[self.is_valid(keys)])
+        return np.concatenate(valid_keys)
+
+    def sample(self, n: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+        """Sample `n` distinct negative pairs.
+
+        Args:
+            n (int): number of pairs to sample
+            rng (np.random.Generator): random number generator used for sampling
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: protein indices of the first and second protein of each pair. Fewer than `n` pairs are returned if not enough valid pairs exist.
+
+        """
+        if n <= 0 or self.n_proteins < 2:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        if n >= ENUMERATE_FRACTION * self.max_pairs():
+            keys = self.sample_enumerated(n, rng)
+        else:
+            keys = self.sample_batched(n, rng)
+        return keys // self.n_proteins, keys % self.n_proteins
+
+    def sample_enumerated(
+        self,
+        n: int,
+        rng: np.random.Generator,
+        exclude: np.ndarray | None = None,
+    ) -> np.ndarray:
+        valid_keys = self.enumerate_valid()
+        if exclude is not None:
+            valid_keys = valid_keys[~np.isin(valid_keys, exclude)]
+        if len(valid_keys) < n:
+            logger.warning(
+                f"Only {len(valid_keys)} valid negative pairs can be sampled. Requested {n}."
+            )
+            n = len(valid_keys)
+        return rng.choice(valid_keys, size=n, replace=False)
+
+    def sample_batched(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        accepted = np.empty(0, dtype=np.int64)
+        acceptance = 1.0
+        while len(accepted) < n:
+            needed = n - len(accepted)
+            batch_size = max(MIN_BATCH_SIZE, int(1.2 * needed / acceptance))
+            a = rng.integers(0, self.n_proteins, size=batch_size)
+            b = rng.integers(0, self.n_proteins - 1, size=batch_size)
+            b += b >= a  # uniform over pairs of distinct proteins
+            keys = self.pair_keys(a, b)
+            _, first = np.unique(keys, return_index=True)
+            keys = keys[np.sort(first)]  # drop duplicates, keep draw order
+            keys = keys[~np.isin(keys, accepted)]
+            keys = keys[self.is_valid(keys)]
+            acceptance = len(keys) / batch_size
+            accepted = np.concatenate([accepted, keys[:needed]])
+            if acceptance < MIN_ACCEPTANCE and len(accepted) < n:
+                logger.debug(
+                    f"Negative sampling acceptance rate is {acceptance:.4f}. Enumerating all valid pairs."
+                )
+                remaining = self.sample_enumerated(
+                    n - len(accepted), rng, exclude=accepted
+                )
+                return np.concatenate([accepted, remaining])
+        return accepted
+
+
+class NegativePool:
+    """Features of negative pairs sampled once and shared by all model runs.
+
+    In "disjoint" mode every run gets its own slice of the pool, so no negative is
+    used by two runs. If the pool is too small for that, or in "subsample" mode, each
+    run draws a random subset of the pool and runs can share negatives.
+
+    Attributes:
+        features (np.ndarray): feature matrix of all negatives in the pool, in random order
+        mode (str): "disjoint" or "subsample"
+        runs (int): number of runs sharing the pool
+        run_size (int): number of negatives per run
+
+    """
+
+    features: np.ndarray
+    mode: str
+    runs: int
+    run_size: int
+
+    def __init__(self, features: np.ndarray, mode: str, runs: int, run_size: int):
+        """Initialize the NegativePool
+
+        Args:
+            features (np.ndarray): feature matrix of the sampled negatives, in random order
+            mode (str): "disjoint" or "subsample"
+            runs (int): number of runs sharing the pool
+            run_size (int): number of negatives requested per run
+
+        Raises:
+            ValueError: Raised if `mode` is not a negative pool mode
+
+        """
+        if mode not in NEGATIVE_POOL_MODES:
+            raise ValueError(
+                f"Negative pool mode must be one of {NEGATIVE_POOL_MODES}, not {mode}"
+            )
+        self.features = features
+        self.mode = mode
+        self.runs = runs
+        self.run_size = min(run_size, len(features))
+        if mode == "disjoint" and not self.is_disjoint:
+            logger.warning(
+                f"Negative pool of {len(features)} pairs is too small for {runs} disjoint runs of {run_size}. Runs will share negatives."
+            )
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    @property
+    def is_disjoint(self) -> bool:
+        return self.mode == "disjoint" and self.runs * self.run_size <= len(self)
+
+    def run_indices(self, run: int, rng: np.random.Generator) -> np.ndarray:
+        """Get the rows of the pool used by a run.
+
+        Args:
+            run (int): index of the run
+            rng (np.random.Generator): random number generator of the run
+
+        Returns:
+            np.ndarray: row indices into `features`
+
+        """
+        if self.is_disjoint:
+            start = run * self.run_size
+            return np.arange(start, start + self.run_size)
+        return rng.choice(len(self), size=self.run_size, replace=False)
@@ -0,0 +1,285 @@
+"""Budgeted XGBoost hyperparameter search by successive halving."""
+
+import itertools
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import xgboost
+from sklearn.metrics import roc_auc_score
+
+from xlranker.ml.backends import booster_params
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARAM_GRID: dict[str, list[Any]] = {
+    "max_depth": [3, 4, 6, 8],
+    "eta": [0.03, 0.1, 0.3],
+    "min_child_weight": [1, 5],
+    "subsample": [0.7, 0.8, 1.0],
+    "colsample_bytree": [0.8, 1.0],
+}
+
+
+def expand_grid(
+    param_grid: dict[str, list[Any]], max_candidates: int | None = None
+) -> list[dict[str, Any]]:
+    """Get the parameter combinations of a grid.
+
+    Args:
+        param_grid (dict[str, list[Any]]): values to try for every parameter
+        max_candidates (int | None, optional): if set and the grid is larger, a random subset of this size is returned. Defaults to None.
+
+    Returns:
+        list[dict[str, Any]]: parameter combinations
+
+    """
+    names = list(param_grid)
+    candidates = [
+        dict(zip(names, values))
+        for values in itertools.product(*(param_grid[name] for name in names))
+    ]
+    if max_candidates is not None and len(candidates) > max_candidates:
+        candidates = random.sample(candidates, max_candidates)
+    return candidates
+
+
+@dataclass
+class Candidate:
+    """Parameter combination and the state of its fold models
+
+    Attributes:
+        params (dict[str, Any]): parameters that differ from the base parameters
+        boosters (list[xgboost.Booster | None]): model of every fold, trained for `rounds` rounds
+        rounds (int): number of boosting rounds trained so far
+        score (float): cross-validation AUC after `rounds` rounds
+
+    """
+
+    params: dict[str, Any]
+    boosters: list[xgboost.Booster | None]
+    rounds: int = 0
+    score: float = math.nan
+
+
+@dataclass
+class TuningResult:
+    """Result of a hyperparameter search
+
+    Attributes:
+        params (dict[str, Any]): best XGBClassifier parameters, including n_estimators
+        score (float): cross-validation AUC of the best parameters
+        history (list[dict[str, Any]]): parameters, rounds and AUC of every evaluation
+        seconds (float): wall time of the search
+        completed (bool): False if the time budget ended the search early
+
+    """
+
+    params: dict[str, Any]
+    score: float
+    history: list[dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+    completed: bool = True
+
+
+class SuccessiveHalving:
+    """Successive halving over XGBoost parameters on fixed cross-validation folds.
+
+    All candidates are trained for a few boosting rounds first. After each rung only the
+    best `1 / reduction_factor` of them continue, with `reduction_factor` times more
+    rounds. Surviving candidates keep training their fold models from where they
+    stopped. Once one candidate is left, it keeps growing its rounds up to `max_rounds`,
+    and a round count is kept only if it improves the cross-validation AUC. Fold
+    matrices are built once per worker thread and reused by every candidate.
+
+    Attributes:
+        X (np.ndarray): training features
+        y (np.ndarray): training labels
+        folds (list[tuple[np.ndarray, np.ndarray]]): train and test rows of every fold
+        base_params (dict[str, Any]): XGBClassifier parameters shared by all candidates. Their n_estimators is replaced by the tuned number of rounds.
+        concurrent (int): number of candidates evaluated at once
+        n_threads (int | None): number of threads per XGBoost model
+        seed (int): seed of all models
+
+    """
+
+    def __init__(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        folds: list[tuple[np.ndarray, np.ndarray]],
+        base_params: dict[str, Any],
+        concurrent: int = 1,
+        n_threads: int | None = None,
+        seed: int = 0,
+    ):
+        """Initialize the search
+
+        Args:
+            X (np.ndarray): training features
+            y (np.ndarray): training labels
+            folds (list[tuple[np.ndarray, np.ndarray]]): train and test rows of every fold
+            base_params (dict[str, Any]): XGBClassifier parameters shared by all candidates
+            concurrent (int, optional): number of candidates evaluated at once. Defaults to 1.
+            n_threads (int | None, optional): number of threads per XGBoost model. Defaults to None.
+            seed (int, optional): seed of all models. Defaults to 0.
+
+        """
+        self.X = X
+        self.y = y
+        self.folds = folds
+        self.base_params = dict(base_params)
+        self.concurrent = concurrent
+        self.n_threads = n_threads
+        self.seed = seed
+        self.local = threading.local()
+
+    def fold_data(self) -> list[xgboost.QuantileDMatrix]:
+        """Training matrices of the folds, built once per thread."""
+        if not hasattr(self.local, "fold_data"):
+            self.local.fold_data = [
+                xgboost.QuantileDMatrix(
+                    self.X[train_rows], label=self.y[train_rows], nthread=self.n_threads
+                )
+                for train_rows, _ in self.folds
+            ]
+        return self.local.fold_data
+
+    def evaluate(self, candidate: Candidate, rounds: int) -> float:
+        """Train the fold models of a candidate up to `rounds` rounds and score them.
+
+        Args:
+            candidate (Candidate): candidate to train further
+            rounds (int): total number of boosting rounds
+
+        Returns:
+            float: cross-validation AUC
+
+        """
+        params, _ = booster_params(self.base_params | candidate.params, self.seed)
+        if self.n_threads is not None:
+            params["nthread"] = self.n_threads
+        predictions = np.empty(len(self.y))
+        for i, (data, (_, test_rows)) in enumerate(zip(self.fold_data(), self.folds)):
+            booster = xgboost.train(
+                params,
+                data,
+                num_boost_round=rounds - candidate.rounds,
+                xgb_model=candidate.boosters[i],
+            )
+            candidate.boosters[i] = booster
+            predictions[test_rows] = booster.inplace_predict(self.X[test_rows])
+        candidate.rounds = rounds
+        candidate.score = float(roc_auc_score(self.y, predictions))
+        return candidate.score
+
+    def run(
+        self,
+        candidates: list[dict[str, Any]],
+        time_budget: float,
+        min_rounds: int = 25,
+        max_rounds: int = 300,
+        reduction_factor: int = 3,
+    ) -> TuningResult:
+        """Search the candidates within a wall-clock budget.
+
+        Args:
+            candidates (list[dict[str, Any]]): parameter combinations to try
+            time_budget (float): seconds after which no new evaluations are started
+            min_rounds (int, optional): boosting rounds of the first rung. Defaults to 25.
+            max_rounds (int, optional): most boosting rounds of any candidate. Defaults to 300.
+            reduction_factor (int, optional): fraction of candidates kept and growth of rounds per rung. Defaults to 3.
+
+        Returns:
+            TuningResult: best parameters found. If no candidate finished, the base parameters unchanged.
+
+        """
+        start = time.perf_counter()
+        remaining = [
+            Candidate(params, [None] * len(self.folds)) for params in candidates
+        ]
+        history: list[dict[str, Any]] = []
+        # parameters, rounds and AUC of the best evaluation. Candidates keep training
+        # after they were best, so their state is copied.
+        best: tuple[dict[str, Any], int, float] | None = None
+        rounds = min_rounds
+        completed = True
+        with ThreadPoolExecutor(max_workers=self.concurrent) as executor:
+            while True:
+                if time.perf_counter() - start > time_budget:
+                    completed = False
+                    break
+                futures = [
+                    (
+                        candidate,
+                        executor.submit(
+                            self.run_evaluation, candidate, rounds, start, time_budget
+                        ),
+                    )
+                    for candidate in remaining
+                ]
+                evaluated = [
+                    candidate for candidate, future in futures if future.result()
+                ]
+                for candidate in evaluated:
+                    history.append(
+                        candidate.params | {"rounds": rounds, "auc": candidate.score}
+                    )
+                if len(evaluated) < len(remaining):
+                    completed = False
+                if len(evaluated) == 0:
+                    break
+                evaluated.sort(key=lambda candidate: candidate.score, reverse=True)
+                top = evaluated[0]
+                # a rung of several candidates replaces the best unless it is incomplete,
+                # the last candidate only replaces it by improving with more rounds
+                if (
+                    best is None
+                    or (completed and len(remaining) > 1)
+                    or top.score > best[2]
+                ):
+                    best = (top.params, top.rounds, top.score)
+                logger.info(
+                    f"Tuning rung with {rounds} rounds: best AUC {best[2]:.4f} of {len(evaluated)} candidate(s)"
+                )
+                if not completed or rounds >= max_rounds:
+                    break
+                remaining = evaluated[: max(1, len(evaluated) // reduction_factor)]
+                rounds = min(rounds * reduction_factor, max_rounds)
+        seconds = time.perf_counter() - start
+        if best is None:  # base_params still holds the caller's n_estimators
+            logger.warning(
+                f"No tuning candidate finished within {time_budget} seconds. Keeping the base parameters."
+            )
+            return TuningResult(
+                params=dict(self.base_params),
+                score=math.nan,
+                seconds=seconds,
+                completed=False,
+            )
+        if not completed:
+            logger.warning(
+                f"Tuning stopped by the time budget of {time_budget} seconds after {len(history)} evaluations"
+            )
+        best_params, best_rounds, best_score = best
+        return TuningResult(
+            params=self.base_params | best_params | {"n_estimators": best_rounds},
+            score=best_score,
+            history=history,
+            seconds=seconds,
+            completed=completed,
+        )
+
+    def run_evaluation(
+        self, candidate: Candidate, rounds: int, start: float, time_budget: float
+    ) -> bool:
+        if time.perf_counter() - start > time_budget:
+            return False  # budget is used up, skip candidates that did not start
+        self.evaluate(candidate, rounds)
+        return True
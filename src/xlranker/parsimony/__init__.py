@@ -1,3 +1,3 @@
-from xlranker.parsimony.prioritize import ParsimonySelector
+from xlranker.parsimony.prioritize import ParsimonyCache, ParsimonySelector
 
-__all__ = ["ParsimonySelector"]
+__all__ = ["ParsimonyCache", "ParsimonySelector"]
@@ -1,8 +1,20 @@
+import gzip
+import hashlib
+import json
 import logging
+import os
+import pickle
 import random
-from dataclasses import dataclass
+import time
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import polars as pl
 
 from xlranker.bio.pairs import PeptidePair, ProteinPair
+from xlranker.config import config
 from xlranker.lib import XLDataSet
 from xlranker.status import PrioritizationStatus, ReportStatus
 from xlranker.util import get_pair_id
@@ -10,6 +22,20 @@ from xlranker.util import get_pair_id
 logger = logging.getLogger(__name__)
 
 
+def intra_sort_key(pair: ProteinPair) -> tuple[float, str]:
+    """Sort key placing the most abundant intra pair first, with missing abundances last.
+
+    Args:
+        pair (ProteinPair): intra protein pair
+
+    Returns:
+        tuple[float, str]: negative abundance followed by the protein name
+
+    """
+    abundance = pair.a.abundance()
+    return (-abundance if abundance is not None else float("-inf"), pair.a.name)
+
+
 def select_random(
     data_set: XLDataSet,
 ) -> None:  # FIXME: This needs to be updated to handle the selection process
@@ -48,23 +74,139 @@ class ParsimonyGroup:
     peptide_pairs: list[PeptidePair]
 
 
+@dataclass
+class GroupStats:
+    """Instrumentation data for the prioritization of one parsimony group
+
+    Attributes:
+        group_id (int): id of the group
+        n_peptide_pairs (int): number of peptide pairs in the group
+        n_protein_pairs (int): number of protein pairs in the group
+        greedy_iterations (int): number of greedy selection iterations
+        ambiguous_sizes (list[int]): sizes of the selected classes that had more than one protein pair
+        seconds (float): wall time of the prioritization in seconds
+        cached (bool): True if the result was reused from a ParsimonyCache
+
+    """
+
+    group_id: int
+    n_peptide_pairs: int
+    n_protein_pairs: int
+    greedy_iterations: int
+    ambiguous_sizes: list[int] = field(default_factory=list)
+    seconds: float = 0.0
+    cached: bool = False
+
+
+GroupResult = dict[str, tuple[PrioritizationStatus, float, ReportStatus]]
+
+
+class ParsimonyCache:
+    """Memo cache of parsimony group results.
+
+    Results are keyed by the signature of a group and the seed of its random stream,
+    so identical groups from replicate runs or parameter sweeps reuse the stored selection.
+
+    Attributes:
+        results (dict[str, GroupResult]): stored status, score, and report status for each protein pair id, keyed by group key
+        hits (int): number of groups reused from the cache
+        misses (int): number of groups not found in the cache
+
+    """
+
+    results: dict[str, GroupResult]
+    hits: int
+    misses: int
+
+    def __init__(self) -> None:
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def get(self, key: str) -> GroupResult | None:
+        result = self.results.get(key, None)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: GroupResult) -> None:
+        self.results[key] = result
+
+    def save(self, file_path: str) -> None:
+        """Save the cached results to a gzipped pickle file.
+
+        Args:
+            file_path (str): path of the output file
+
+        """
+        with gzip.open(file_path, "wb") as w:
+            pickle.dump(self.results, w)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ParsimonyCache":
+        """Load cached results saved with `ParsimonyCache.save`.
+
+        Args:
+            file_path (str): path of the cache file
+
+        Returns:
+            ParsimonyCache: cache with the stored results and reset counters
+
+        """
+        cache = cls()
+        with gzip.open(file_path, "rb") as r:
+            cache.results = pickle.load(r)
+        return cache
+
+
 class ParsimonySelector:
     data_set: XLDataSet
     protein_groups: dict[int, list[ProteinPair]]
     peptide_groups: dict[int, list[PeptidePair]]
     can_prioritize: bool
+    next_group_id: int
+    instrument: bool
+    group_stats: dict[int, GroupStats]
+    create_groups_seconds: float
+    cache: ParsimonyCache | None
+    seed: int | None
 
-    def __init__(self, data_set: XLDataSet):
+    def __init__(
+        self,
+        data_set: XLDataSet,
+        instrument: bool | None = None,
+        cache: ParsimonyCache | None = None,
+        seed: int | None = None,
+    ):
         """Initialize the ParsimonySelector object
 
+        If `seed` is set or a cache is used, every group gets its own random stream seeded from
+        `seed` and the group signature, so results do not depend on the group processing order.
+
         Args:
             data_set (XLDataSet): cross-linking dataset
+            instrument (bool | None, optional): if True, record group sizes and timings and write them to `config.output`. If None, use `config.detailed`. Defaults to None.
+            cache (ParsimonyCache | None, optional): cache used to reuse results of identical groups. Defaults to None.
+            seed (int | None, optional): seed for the per-group random streams. If None and a cache is used, a seed is drawn from `random`. Defaults to None.
         """
         self.data_set = data_set
         self.protein_groups = {}
         self.peptide_groups = {}
         self.can_prioritize = False
         self.network = None
+        self.next_group_id = 1
+        self.instrument = config.detailed if instrument is None else instrument
+        self.group_stats = {}
+        self.create_groups_seconds = 0.0
+        self.cache = cache
+        if seed is None and cache is not None:
+            seed = random.randrange(2**32)
+        self.seed = seed
 
     def assign_protein_pair(self, protein_pair: ProteinPair, group_id: int) -> None:
         if protein_pair.in_group:
@@ -99,15 +241,100 @@ class ParsimonySelector:
             )
 
     def create_groups(self) -> None:
-        next_group_id = 1
-        for pair in self.data_set.peptide_pairs.values():
+        start_time = time.perf_counter() if self.instrument else 0.0
+        self.group_peptide_pairs(self.data_set.peptide_pairs.values())
+        self.can_prioritize = True
+        if self.instrument:
+            self.create_groups_seconds = time.perf_counter() - start_time
+
+    def group_peptide_pairs(self, peptide_pairs: Iterable[PeptidePair]) -> list[int]:
+        """Create new groups for all ungrouped peptide pairs in `peptide_pairs`.
+
+        Args:
+            peptide_pairs (Iterable[PeptidePair]): peptide pairs used as the starting points of new groups
+
+        Returns:
+            list[int]: ids of the newly created groups
+
+        """
+        new_groups: list[int] = []
+        for pair in peptide_pairs:
             if pair.in_group or len(pair.connections) == 0:
                 continue
-            self.assign_peptide_pair(pair, next_group_id)
-            next_group_id += 1
-        self.can_prioritize = True
+            self.assign_peptide_pair(pair, self.next_group_id)
+            new_groups.append(self.next_group_id)
+            self.next_group_id += 1
+        return new_groups
+
+    def dissolve_group(self, group_id: int) -> list[PeptidePair]:
+        """Remove a group and reset all of its members.
+
+        Args:
+            group_id (int): id of the group to remove
+
+        Returns:
+            list[PeptidePair]: peptide pairs of the group that are still in the data set
+
+        """
+        self.group_stats.pop(group_id, None)
+        for protein_pair in self.protein_groups.pop(group_id, []):
+            protein_pair.clear_group()
+        remaining: list[PeptidePair] = []
+        for peptide_pair in self.peptide_groups.pop(group_id, []):
+            peptide_pair.clear_group()
+            if peptide_pair.pair_id in self.data_set.peptide_pairs:
+                remaining.append(peptide_pair)
+        return remaining
+
+    def group_signature(self, group_id: int) -> str:
+        """Get a canonical signature of a group.
+
+        The signature covers the peptide pair connections of every protein pair and the
+        abundance order of the intra pairs, which is all that prioritization depends on.
+
+        Args:
+            group_id (int): id of the group
+
+        Returns:
+            str: hex digest of the group signature
+
+        """
+        protein_pairs = self.protein_groups[group_id]
+        rows = sorted(
+            f"{pair.pair_id}:{pair.connectivity_id()}" for pair in protein_pairs
+        )
+        intra_order = [
+            pair.pair_id
+            for pair in sorted(
+                (pair for pair in protein_pairs if pair.is_intra), key=intra_sort_key
+            )
+        ]
+        rows.append("intra:" + ",".join(intra_order))
+        return hashlib.sha1("\n".join(rows).encode()).hexdigest()
 
     def prioritize_group(self, group_id: int) -> None:
+        start_time = time.perf_counter() if self.instrument else 0.0
+        rng = random
+        cache_key = None
+        if self.seed is not None:
+            cache_key = f"{self.seed}:{self.group_signature(group_id)}"
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.apply_group_result(group_id, cached)
+                    if self.instrument:
+                        self.group_stats[group_id] = GroupStats(
+                            group_id=group_id,
+                            n_peptide_pairs=len(self.peptide_groups[group_id]),
+                            n_protein_pairs=len(self.protein_groups[group_id]),
+                            greedy_iterations=0,
+                            seconds=time.perf_counter() - start_time,
+                            cached=True,
+                        )
+                    return
+            rng = random.Random(cache_key)
+        greedy_iterations = 0
+        ambiguous_sizes: list[int] = []
         peptide_names = set(
             [get_pair_id(pep.a, pep.b) for pep in self.peptide_groups[group_id]]
         )
@@ -119,6 +346,7 @@ class ParsimonySelector:
                 protein_pair_groups[conn_id] = []
             protein_pair_groups[conn_id].append(protein_pair)
         while len(peptide_names) > 0:
+            greedy_iterations += 1
             max_connections = 0
             best_pairs: set[str] = (
                 set()
@@ -131,12 +359,14 @@ class ParsimonySelector:
                     best_pairs.add(conn_id)
                 elif max_connections == n_conn:
                     best_pairs.add(conn_id)
-            selected_index = random.randint(
+            selected_index = rng.randint(
                 0, len(best_pairs) - 1
             )  # select one random index to move forward
-            best_pair_group = protein_pair_groups[list(best_pairs)[selected_index]]
+            best_pair_group = protein_pair_groups[sorted(best_pairs)[selected_index]]
             peptide_names.difference_update(best_pair_group[0].connections)
             intra_pairs: list[ProteinPair] = []
+            if len(best_pair_group) > 1:
+                ambiguous_sizes.append(len(best_pair_group))
             # for pair in best_pair_group
             status = (
                 PrioritizationStatus.PARSIMONY_PRIMARY_SELECTED
@@ -154,14 +384,7 @@ class ParsimonySelector:
                             ReportStatus.CONSERVATIVE
                         )  # Unambiguous pairs are reported as CONSERVATIVE
             if len(intra_pairs) > 0:
-                intra_pairs.sort(
-                    key=lambda pair: (
-                        -pair.a.abundance()  # type: ignore
-                        if pair.a.abundance() is not None
-                        else float("-inf"),
-                        pair.a.name,
-                    )
-                )
+                intra_pairs.sort(key=intra_sort_key)
                 intra_pairs[0].set_prioritization_status(
                     PrioritizationStatus.PARSIMONY_PRIMARY_SELECTED
                 )
@@ -187,6 +410,41 @@ class ParsimonySelector:
                         PrioritizationStatus.PARSIMONY_NOT_SELECTED
                     )
                     protein_pair.set_report_status(ReportStatus.ALL)
+        if self.cache is not None and cache_key is not None:
+            self.cache.put(
+                cache_key,
+                {
+                    pair.pair_id: (
+                        pair.prioritization_status,
+                        pair.score,
+                        pair.report_status,
+                    )
+                    for pair in proteins
+                },
+            )
+        if self.instrument:
+            self.group_stats[group_id] = GroupStats(
+                group_id=group_id,
+                n_peptide_pairs=len(self.peptide_groups[group_id]),
+                n_protein_pairs=len(proteins),
+                greedy_iterations=greedy_iterations,
+                ambiguous_sizes=ambiguous_sizes,
+                seconds=time.perf_counter() - start_time,
+            )
+
+    def apply_group_result(self, group_id: int, result: GroupResult) -> None:
+        """Set the status, score, and report status of every protein pair in a group from a stored result.
+
+        Args:
+            group_id (int): id of the group
+            result (GroupResult): stored result from a ParsimonyCache
+
+        """
+        for pair in self.protein_groups[group_id]:
+            status, score, report_status = result[pair.pair_id]
+            pair.set_prioritization_status(status)
+            pair.set_score(score)
+            pair.set_report_status(report_status)
 
     def prioritize(self) -> None:
         if not self.can_prioritize:
@@ -194,9 +452,158 @@ class ParsimonySelector:
                 "Parsimony group creation not performed before prioritization. Running now."
             )
             self.create_groups()
+        previous_hits = 0 if self.cache is None else self.cache.hits
         for group in self.protein_groups:
             self.prioritize_group(group)
+        if self.cache is not None:
+            logger.info(
+                f"Reused {self.cache.hits - previous_hits} of {len(self.protein_groups)} parsimony groups from cache"
+            )
 
     def run(self) -> None:
         self.create_groups()
         self.prioritize()
+        if self.instrument:
+            self.write_stats()
+
+    def write_stats(self, output_dir: str | None = None) -> None:
+        """Write the recorded group instrumentation data.
+
+        Writes `parsimony_groups.tsv` with one row per group and `parsimony_stats.json`
+        with the component counts, size histograms, and total timings.
+
+        Args:
+            output_dir (str | None, optional): directory for the output files. If None, use `config.output`. Defaults to None.
+
+        """
+        if not self.instrument:
+            logger.warning(
+                "Parsimony instrumentation is disabled. No statistics to write."
+            )
+            return
+        output_path = Path(config.output if output_dir is None else output_dir)
+        os.makedirs(output_path, exist_ok=True)
+        stats = sorted(self.group_stats.values(), key=lambda s: s.group_id)
+        pl.DataFrame(
+            {
+                "group": [s.group_id for s in stats],
+                "peptide_pairs": [s.n_peptide_pairs for s in stats],
+                "protein_pairs": [s.n_protein_pairs for s in stats],
+                "greedy_iterations": [s.greedy_iterations for s in stats],
+                "ambiguous_classes": [len(s.ambiguous_sizes) for s in stats],
+                "largest_ambiguous_class": [
+                    max(s.ambiguous_sizes, default=0) for s in stats
+                ],
+                "seconds": [s.seconds for s in stats],
+                "cached": [s.cached for s in stats],
+            },
+            schema={
+                "group": pl.Int64,
+                "peptide_pairs": pl.Int64,
+                "protein_pairs": pl.Int64,
+                "greedy_iterations": pl.Int64,
+                "ambiguous_classes": pl.Int64,
+                "largest_ambiguous_class": pl.Int64,
+                "seconds": pl.Float64,
+                "cached": pl.Boolean,
+            },
+        ).write_csv(str(output_path / "parsimony_groups.tsv"), separator="\t")
+
+        def histogram(values: Iterable[int]) -> dict[str, int]:
+            return {str(size): n for size, n in sorted(Counter(values).items())}
+
+        summary = {
+            "n_groups": len(stats),
+            "create_groups_seconds": self.create_groups_seconds,
+            "prioritize_seconds": sum(s.seconds for s in stats),
+            "greedy_iterations": sum(s.greedy_iterations for s in stats),
+            "cached_groups": sum(s.cached for s in stats),
+            "largest_group": max(
+                (
+                    {
+                        "group": s.group_id,
+                        "peptide_pairs": s.n_peptide_pairs,
+                        "protein_pairs": s.n_protein_pairs,
+                    }
+                    for s in stats
+                ),
+                key=lambda g: g["protein_pairs"],
+                default=None,
+            ),
+            "peptide_pairs_histogram": histogram(s.n_peptide_pairs for s in stats),
+            "protein_pairs_histogram": histogram(s.n_protein_pairs for s in stats),
+            "ambiguous_class_histogram": histogram(
+                size for s in stats for size in s.ambiguous_sizes
+            ),
+        }
+        with open(output_path / "parsimony_stats.json", "w") as w:
+            json.dump(summary, w, indent=2)
+        logger.info(f"Parsimony statistics saved to: {output_path}")
+
+    def update(
+        self,
+        added: dict[str, PeptidePair] | None = None,
+        removed: Iterable[str] | None = None,
+        remove_intra: bool = False,
+    ) -> list[int]:
+        """Incrementally update the network and parsimony results with added or removed peptide pairs.
+
+        Only the groups touched by the changes are rebuilt and prioritized again.
+        Touched groups may merge or split, so they are given new group ids.
+        All other groups keep their ids and statuses.
+        With instrumentation, the stats of dissolved groups are replaced by those of the
+        new groups and the output files are written again.
+
+        Args:
+            added (dict[str, PeptidePair] | None, optional): new peptide pairs keyed by pair id. Peptides must already have their mapped proteins. Defaults to None.
+            removed (Iterable[str] | None, optional): ids of peptide pairs to remove. Defaults to None.
+            remove_intra (bool, optional): if true, skip added peptide pairs that could map to an intra protein pair. Defaults to False.
+
+        Returns:
+            list[int]: ids of the groups that were prioritized again
+
+        """
+        added = {} if added is None else added
+        removed = [] if removed is None else list(removed)
+        if not self.can_prioritize:
+            logger.warning(
+                "Parsimony group creation not performed before update. Running full parsimony."
+            )
+            self.data_set.remove_peptide_pairs(removed)
+            self.data_set.add_peptide_pairs(added, remove_intra=remove_intra)
+            self.run()
+            return list(self.protein_groups.keys())
+        touched_groups: set[int] = set()
+        for key in removed:
+            if key in self.data_set.peptide_pairs:
+                peptide_pair = self.data_set.peptide_pairs[key]
+                if peptide_pair.in_group:
+                    touched_groups.add(peptide_pair.group_id)
+        self.data_set.remove_peptide_pairs(removed)
+        touched_pairs = self.data_set.add_peptide_pairs(
+            added, remove_intra=remove_intra
+        )
+        for protein_pair_id in touched_pairs:
+            protein_pair = self.data_set.protein_pairs[protein_pair_id]
+            if protein_pair.in_group:
+                touched_groups.add(protein_pair.group_id)
+        start_points: list[PeptidePair] = []
+        for group_id in touched_groups:
+            start_points.extend(self.dissolve_group(group_id))
+        start_points.extend(
+            self.data_set.peptide_pairs[key]
+            for key in added
+            if key in self.data_set.peptide_pairs
+        )
+        start_time = time.perf_counter() if self.instrument else 0.0
+        new_groups = self.group_peptide_pairs(start_points)
+        if self.instrument:
+            self.create_groups_seconds += time.perf_counter() - start_time
+        for group_id in new_groups:
+            self.prioritize_group(group_id)
+        logger.info(
+            f"Updated {len(touched_groups)} parsimony group(s) into {len(new_groups)} new group(s)"
+        )
+        if self.instrument:
+            self.write_stats()
+        return new_groups
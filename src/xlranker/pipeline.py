@@ -24,7 +24,7 @@ def run_full_pipeline(data_set: XLDataSet, threshold: float = 0.5) -> XLDataSet:
     model = PrioritizationModel(data_set)
     model.run_model()
     get_final_network(data_set, ThresholdSelector(threshold))
-    make_all_reports(data_set.protein_pairs.values())
+    make_all_reports(data_set.registry)
     return data_set
 
 
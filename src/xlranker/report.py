@@ -1,21 +1,27 @@
 """Report helper functions"""
 
+from collections.abc import Iterable
 from pathlib import Path
 
-from xlranker.bio.pairs import ProteinPair
+from xlranker.bio.pairs import PairRegistry, ProteinPair
 from xlranker.config import config
 from xlranker.lib import write_pair_to_network
 from xlranker.status import ReportStatus
 
 
 def make_report(
-    pairs: list[ProteinPair], status: ReportStatus, output_path: Path
+    pairs: Iterable[ProteinPair] | PairRegistry,
+    status: ReportStatus,
+    output_path: Path,
 ) -> None:
-    valid_pairs = [pair for pair in pairs if pair.report_status <= status]
+    if isinstance(pairs, PairRegistry):  # only visits the reported pairs
+        valid_pairs = pairs.with_report_status_at_most(status)
+    else:
+        valid_pairs = [pair for pair in pairs if pair.report_status <= status]
     write_pair_to_network(valid_pairs, str(output_path))
 
 
-def make_all_reports(pairs: list[ProteinPair]) -> None:
+def make_all_reports(pairs: Iterable[ProteinPair] | PairRegistry) -> None:
     output_folder = Path(config.output).joinpath("reports")
     output_folder.mkdir(exist_ok=True)
     make_report(pairs, ReportStatus.CONSERVATIVE, output_folder / "conservative.tsv")
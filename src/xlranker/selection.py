@@ -1,3 +1,4 @@
+import heapq
 from abc import ABC, abstractmethod
 
 from xlranker.bio.pairs import ProteinPair
@@ -135,6 +136,13 @@ class ThresholdSelector(PairSelector):
     top_n: int | None
 
     def __init__(self, threshold: float, top_n: int | None = None) -> None:
+        """Select the best pair of every subgroup and other pairs above a threshold.
+
+        Args:
+            threshold (float): pairs scoring above this are secondary selections
+            top_n (int | None, optional): if set, limits the secondary selections of a subgroup. Defaults to None.
+
+        """
         super().__init__()
         self.threshold = threshold
         self.top_n = top_n
@@ -187,11 +195,13 @@ class ThresholdSelector(PairSelector):
                     for pair in group_list:
                         assign_secondary_selected_status(pair)
                 else:
-                    group_list.sort(
-                        key=lambda pair: (-pair.score, pair.pair_id)
-                    )  # -pair.score makes it so higher scores come first
-                    for i in range(self.top_n - 1):
-                        assign_secondary_selected_status(group_list[i])
+                    # partial selection of the top_n - 1 best, O(n log top_n)
+                    for pair in heapq.nsmallest(
+                        self.top_n - 1,
+                        group_list,
+                        key=lambda pair: (-pair.score, pair.pair_id),
+                    ):  # -pair.score makes it so higher scores come first
+                        assign_secondary_selected_status(pair)
 
 
 class WithinSelector(PairSelector):  # TODO: Remove this.
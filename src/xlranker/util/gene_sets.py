@@ -0,0 +1,165 @@
+"""Gene set co-membership lookups."""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+BATCH_SIZE = 65536  # rows of bitsets compared at a time
+
+
+def gmts_to_csr(
+    gmts: list[list[set[str]]],
+) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Encode GMTs as a gene dictionary and compressed sparse row (CSR) set membership.
+
+    Args:
+        gmts (list[list[set[str]]]): list of gmts, which are lists of sets
+
+    Returns:
+        tuple[list[str], np.ndarray, np.ndarray]: sorted gene names, CSR row pointers, and CSR gene codes. Sets of all GMTs are rows in GMT order.
+
+    """
+    genes = sorted({gene for gmt in gmts for gene_set in gmt for gene in gene_set})
+    codes = {gene: i for i, gene in enumerate(genes)}
+    set_indptr = [0]
+    gene_indices: list[int] = []
+    for gmt in gmts:
+        for gene_set in gmt:
+            gene_indices.extend(sorted(codes[gene] for gene in gene_set))
+            set_indptr.append(len(gene_indices))
+    return (
+        genes,
+        np.array(set_indptr, dtype=np.int64),
+        np.array(gene_indices, dtype=np.int32),
+    )
+
+
+class GeneSetIndex:
+    """Inverted index from genes to the gene sets that contain them.
+
+    Each gene has a bitset over all gene sets of all GMTs, so checking if two genes
+    share a set is one bitwise AND, and batches of pairs are checked vectorized.
+    The bitsets are dense and held in memory, about 5 MB for the default GMTs. The
+    CSR arrays are only read while building them and are not kept.
+
+    Attributes:
+        genes (list[str]): gene names. The position of a gene is its code.
+        codes (dict[str, int]): code of each gene
+        n_sets (int): number of gene sets over all GMTs
+        bits (np.ndarray): uint8 array of shape (genes, ceil(n_sets / 8)) with the packed set membership of each gene
+
+    """
+
+    genes: list[str]
+    codes: dict[str, int]
+    n_sets: int
+    bits: np.ndarray
+
+    def __init__(
+        self, genes: Sequence[str], set_indptr: np.ndarray, gene_indices: np.ndarray
+    ):
+        """Initialize the index from a compressed sparse row (CSR) set membership.
+
+        Use `GeneSetIndex.from_gmts` to build the index from lists of gene sets.
+
+        Args:
+            genes (Sequence[str]): gene names. The position of a gene is its code.
+            set_indptr (np.ndarray): CSR row pointers. Set `i` contains the genes `gene_indices[set_indptr[i]:set_indptr[i + 1]]`.
+            gene_indices (np.ndarray): CSR gene codes of all sets
+
+        """
+        self.genes = list(genes)
+        self.codes = {gene: i for i, gene in enumerate(self.genes)}
+        set_indptr = np.asarray(set_indptr, dtype=np.int64)
+        gene_indices = np.asarray(gene_indices, dtype=np.int64)
+        self.n_sets = len(set_indptr) - 1
+        set_ids = np.repeat(np.arange(self.n_sets, dtype=np.int64), np.diff(set_indptr))
+        self.bits = np.zeros((len(self.genes), (self.n_sets + 7) // 8), dtype=np.uint8)
+        np.bitwise_or.at(
+            self.bits,
+            (gene_indices, set_ids >> 3),
+            np.left_shift(1, set_ids & 7).astype(np.uint8),
+        )
+
+    @classmethod
+    def from_gmts(cls, gmts: list[list[set[str]]]) -> "GeneSetIndex":
+        """Build the index from GMTs.
+
+        Args:
+            gmts (list[list[set[str]]]): list of gmts, which are lists of sets
+
+        Returns:
+            GeneSetIndex: index over all sets of all GMTs
+
+        """
+        return cls(*gmts_to_csr(gmts))
+
+    def encode(self, names: Sequence[str]) -> np.ndarray:
+        """Get the integer codes of genes.
+
+        Args:
+            names (Sequence[str]): gene names
+
+        Returns:
+            np.ndarray: int64 codes, with -1 for genes not in any set
+
+        """
+        return np.fromiter(
+            (self.codes.get(name, -1) for name in names),
+            dtype=np.int64,
+            count=len(names),
+        )
+
+    def share_set_codes(self, a_codes: np.ndarray, b_codes: np.ndarray) -> np.ndarray:
+        """Check a batch of encoded gene pairs for a shared gene set.
+
+        Args:
+            a_codes (np.ndarray): codes of the first genes, as returned by `encode`
+            b_codes (np.ndarray): codes of the second genes, as returned by `encode`
+
+        Returns:
+            np.ndarray: boolean array, True where both genes are in at least one set
+
+        """
+        a_codes = np.asarray(a_codes, dtype=np.int64)
+        b_codes = np.asarray(b_codes, dtype=np.int64)
+        shared = np.zeros(len(a_codes), dtype=bool)
+        valid = np.flatnonzero((a_codes >= 0) & (b_codes >= 0))
+        for start in range(0, len(valid), BATCH_SIZE):
+            rows = valid[start : start + BATCH_SIZE]
+            shared[rows] = np.any(
+                self.bits[a_codes[rows]] & self.bits[b_codes[rows]], axis=1
+            )
+        return shared
+
+    def share_set_pairs(
+        self, a_names: Sequence[str], b_names: Sequence[str]
+    ) -> np.ndarray:
+        """Check a batch of gene pairs for a shared gene set.
+
+        Args:
+            a_names (Sequence[str]): first genes
+            b_names (Sequence[str]): second genes
+
+        Returns:
+            np.ndarray: boolean array, True where both genes are in at least one set
+
+        """
+        return self.share_set_codes(self.encode(a_names), self.encode(b_names))
+
+    def share_set(self, a: str, b: str) -> bool:
+        """Check if a and b are located in the same set in any of the GMTs.
+
+        Args:
+            a (str): gene a
+            b (str): gene b
+
+        Returns:
+            bool: True if a and b both located in at least one set
+
+        """
+        a_code = self.codes.get(a, -1)
+        b_code = self.codes.get(b, -1)
+        if a_code < 0 or b_code < 0:
+            return False
+        return bool(np.any(self.bits[a_code] & self.bits[b_code]))
@@ -0,0 +1,134 @@
+"""Known protein-protein interaction lookups."""
+
+from collections.abc import Sequence
+
+import numpy as np
+import polars as pl
+
+
+class PPIIndex:
+    """Membership index of known protein-protein interactions (PPIs).
+
+    Protein ids are interned to integer codes, and each interaction is stored as one
+    sorted int64 key, so a batch of pairs is checked with a single binary search.
+    The index is symmetric: the order of the proteins in a pair does not matter.
+
+    Attributes:
+        proteins (list[str]): sorted protein ids. The position of an id is its code.
+        keys (np.ndarray): sorted, unique int64 keys of all known interactions
+
+    """
+
+    proteins: list[str]
+    keys: np.ndarray
+
+    def __init__(self, proteins: Sequence[str], keys: np.ndarray):
+        """Initialize a PPIIndex from interned protein ids and interaction keys.
+
+        Use `PPIIndex.from_dataframe` to build the index from a PPI table.
+
+        Args:
+            proteins (Sequence[str]): sorted protein ids. The position of an id is its code.
+            keys (np.ndarray): sorted, unique int64 keys where a key is `low_code * len(proteins) + high_code`
+
+        """
+        self.proteins = list(proteins)
+        self.keys = np.asarray(keys, dtype=np.int64)
+
+    @classmethod
+    def from_dataframe(cls, ppi_db: pl.DataFrame) -> "PPIIndex":
+        """Build the index from a PPI table.
+
+        Args:
+            ppi_db (pl.DataFrame): PPI database with the two protein columns P1 and P2
+
+        Returns:
+            PPIIndex: membership index of all rows in `ppi_db`
+
+        """
+        ppi_db = ppi_db.select(
+            pl.col("P1").cast(pl.String), pl.col("P2").cast(pl.String)
+        ).drop_nulls()
+        proteins = pl.concat([ppi_db["P1"], ppi_db["P2"]]).unique().sort().to_list()
+        index = cls(proteins, np.empty(0, dtype=np.int64))
+        keys = index.pair_keys(index.encode(ppi_db["P1"]), index.encode(ppi_db["P2"]))
+        index.keys = np.unique(keys)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def encode(self, names: Sequence[str] | pl.Series) -> np.ndarray:
+        """Get the integer codes of protein ids.
+
+        Args:
+            names (Sequence[str] | pl.Series): protein ids
+
+        Returns:
+            np.ndarray: int64 codes, with -1 for ids not in the index
+
+        """
+        return (
+            pl.Series(names, dtype=pl.String)
+            .replace_strict(
+                self.proteins,
+                np.arange(len(self.proteins), dtype=np.int64),
+                default=-1,
+                return_dtype=pl.Int64,
+            )
+            .fill_null(-1)
+            .to_numpy()
+        )
+
+    def pair_keys(self, a_codes: np.ndarray, b_codes: np.ndarray) -> np.ndarray:
+        low = np.minimum(a_codes, b_codes).astype(np.int64)
+        high = np.maximum(a_codes, b_codes).astype(np.int64)
+        return low * len(self.proteins) + high
+
+    def contains_codes(self, a_codes: np.ndarray, b_codes: np.ndarray) -> np.ndarray:
+        """Check a batch of encoded pairs for known interactions.
+
+        Args:
+            a_codes (np.ndarray): codes of the first proteins, as returned by `encode`
+            b_codes (np.ndarray): codes of the second proteins, as returned by `encode`
+
+        Returns:
+            np.ndarray: boolean array, True where the pair has a known interaction
+
+        """
+        a_codes = np.asarray(a_codes, dtype=np.int64)
+        b_codes = np.asarray(b_codes, dtype=np.int64)
+        found = (a_codes >= 0) & (b_codes >= 0)
+        if len(self.keys) == 0:
+            return np.zeros(len(a_codes), dtype=bool)
+        keys = self.pair_keys(a_codes, b_codes)
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return found & (self.keys[positions] == keys)
+
+    def contains_pairs(
+        self, a_names: Sequence[str] | pl.Series, b_names: Sequence[str] | pl.Series
+    ) -> np.ndarray:
+        """Check a batch of protein id pairs for known interactions.
+
+        Args:
+            a_names (Sequence[str] | pl.Series): ids of the first proteins
+            b_names (Sequence[str] | pl.Series): ids of the second proteins
+
+        Returns:
+            np.ndarray: boolean array, True where the pair has a known interaction
+
+        """
+        return self.contains_codes(self.encode(a_names), self.encode(b_names))
+
+    def contains(self, a: str, b: str) -> bool:
+        """Check if protein a and protein b have a known interaction.
+
+        Args:
+            a (str): first protein
+            b (str): second protein
+
+        Returns:
+            bool: True if there is a known interaction
+
+        """
+        return bool(self.contains_pairs([a], [b])[0])
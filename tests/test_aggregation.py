@@ -0,0 +1,25 @@
+import numpy as np
+
+from xlranker.ml.aggregation import ConvergenceMonitor, PredictionAccumulator
+
+
+def test_accumulator_matches_numpy():
+    runs = np.random.default_rng(0).random((7, 20))
+    accumulator = PredictionAccumulator(20)
+    for predictions in runs:
+        accumulator.add(predictions)
+    np.testing.assert_allclose(accumulator.mean, runs.mean(axis=0))
+    np.testing.assert_allclose(accumulator.std(), runs.std(axis=0))
+    votes = (runs >= 0.5).sum(axis=0)
+    np.testing.assert_allclose(
+        accumulator.agreement(), np.maximum(votes, 7 - votes) / 7
+    )
+
+
+def test_convergence_needs_patience():
+    monitor = ConvergenceMonitor(tolerance=0.01, patience=2)
+    assert not monitor.update(np.array([0.5, 0.5]))
+    assert not monitor.update(np.array([0.505, 0.5]))
+    assert not monitor.update(np.array([0.6, 0.5]))  # large change resets the streak
+    assert not monitor.update(np.array([0.601, 0.5]))
+    assert monitor.update(np.array([0.602, 0.501]))
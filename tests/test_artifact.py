@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import xgboost
+
+from xlranker.ml.artifact import ModelArtifact
+from xlranker.ml.backends import LogisticBackend
+
+
+def train_booster(seed: int) -> xgboost.Booster:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(60, 3))
+    y = (X[:, 0] > 0).astype(float)
+    return xgboost.train(
+        {"objective": "binary:logistic", "seed": seed},
+        xgboost.DMatrix(X, label=y),
+        num_boost_round=5,
+    )
+
+
+def make_artifact() -> ModelArtifact:
+    return ModelArtifact(
+        feature_names=["o1_a", "o1_b", "is_ppi"],
+        omic_names=["o1"],
+        uses_ppi=True,
+        uppercase=True,
+        model_config={"runs": 2, "folds": 2},
+        run_models=[[train_booster(0)], [train_booster(1), train_booster(2)]],
+    )
+
+
+def test_artifact_round_trip(tmp_path):
+    artifact = make_artifact()
+    artifact.save(tmp_path / "model")
+    loaded = ModelArtifact.load(tmp_path / "model")
+    assert loaded.feature_names == artifact.feature_names
+    assert loaded.config_hash == artifact.config_hash
+    assert [len(models) for models in loaded.run_models] == [1, 2]
+    X = np.random.default_rng(5).normal(size=(10, 3))
+    for saved, original in zip(loaded.run_models[1], artifact.run_models[1]):
+        np.testing.assert_allclose(
+            saved.inplace_predict(X), original.inplace_predict(X)
+        )
+
+
+def test_artifact_rejects_modified_config(tmp_path):
+    manifest = make_artifact().save(tmp_path)
+    manifest.write_text(manifest.read_text().replace('"runs": 2', '"runs": 3'))
+    with pytest.raises(ValueError):
+        ModelArtifact.load(tmp_path)
+
+
+def test_artifact_round_trip_pickled_backend(tmp_path):
+    backend = LogisticBackend({})
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(40, 3))
+    backend.start_run(X, (X[:, 0] > 0).astype(float))
+    artifact = make_artifact()
+    artifact.backend = "logistic"
+    artifact.run_models = [[backend.fit(None, 0)]]
+    loaded = ModelArtifact.load(artifact.save(tmp_path))
+    np.testing.assert_allclose(
+        backend.predict(loaded.run_models[0][0], X),
+        backend.predict(artifact.run_models[0][0], X),
+    )
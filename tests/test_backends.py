@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from xlranker.ml.backends import BACKENDS, get_backend
+from xlranker.ml.models import ModelConfig
+
+
+@pytest.mark.parametrize("name", list(BACKENDS))
+def test_backend_fits_rows_with_missing_values(name):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4)).astype(np.float32)
+    y = (X[:, 0] > 0).astype(float)
+    X[::7, 1] = np.nan
+    backend = ModelConfig(backend=name).create_backend(n_threads=1)
+    backend.start_run(X, y)
+    fold_model = backend.fit(np.arange(150), seed=1)
+    predictions = backend.predict(fold_model, X[150:])
+    assert predictions.shape == (50,)
+    assert np.all((predictions >= 0) & (predictions <= 1))
+    assert np.mean((predictions > 0.5) == y[150:]) > 0.8
+
+
+def test_unknown_backend():
+    assert not ModelConfig(backend="svm").validate()
+    with pytest.raises(ValueError):
+        get_backend("svm")
+
+
+def test_xgboost_contributions_sum_to_margin():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 3)).astype(np.float32)
+    backend = ModelConfig(backend="xgboost-native").create_backend(n_threads=1)
+    backend.start_run(X, (X[:, 0] > 0).astype(float))
+    model = backend.fit(None, seed=0)
+    contributions = backend.contributions(model, X)
+    assert contributions.shape == (100, 4)
+    probability = 1 / (1 + np.exp(-contributions.sum(axis=1)))
+    np.testing.assert_allclose(probability, backend.predict(model, X), rtol=1e-4)
+
+
+@pytest.mark.parametrize("name", ["xgboost", "xgboost-native"])
+def test_continue_fit_adds_rounds_to_a_copy(name):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 3)).astype(np.float32)
+    y = (X[:, 0] > 0).astype(float)
+    backend = ModelConfig(backend=name, xgb_params={"n_estimators": 5}).create_backend()
+    backend.start_run(X, y)
+    saved = backend.fit(None, seed=1)
+    before = backend.predict(saved, X)
+    updated = backend.continue_fit(saved, None, seed=2, rounds=3)
+    assert updated.num_boosted_rounds() == 8
+    assert saved.num_boosted_rounds() == 5
+    np.testing.assert_array_equal(backend.predict(saved, X), before)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from xlranker.bio import Protein
+from xlranker.ml.external import PairBatchIter, batch_rows, iter_batches
+from xlranker.ml.features import FeatureBuilder
+
+PROTEINS = [
+    Protein(name, name, {"x": float(i), "y": None if i % 3 else float(-i)})
+    for i, name in enumerate("ABCDEFG")
+]
+
+
+def test_batches_match_full_matrix():
+    builder = FeatureBuilder(PROTEINS, ["x", "y"])
+    rng = np.random.default_rng(0)
+    a, b = rng.integers(0, len(PROTEINS), (2, 11))
+    full = builder.build(a, b)
+    batches = list(iter_batches(builder, a, b, rows=4))
+    assert [len(X) for _, X in batches] == [4, 4, 3]
+    np.testing.assert_array_equal(np.vstack([X for _, X in batches]), full)
+
+    labels = np.arange(11, dtype=np.float64)
+    received = []
+    batch_iter = PairBatchIter(builder, a, b, labels, 4, "unused")
+    while batch_iter.next(lambda data, label: received.append((data, label))):
+        pass
+    np.testing.assert_array_equal(np.vstack([X for X, _ in received]), full)
+    np.testing.assert_array_equal(np.concatenate([y for _, y in received]), labels)
+
+
+def test_batch_rows_fits_limit():
+    assert batch_rows(1, 4) == 2**20 // 4 // 32
+    assert batch_rows(1, 10**9) == 1
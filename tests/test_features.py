@@ -0,0 +1,41 @@
+import numpy as np
+
+from xlranker.bio import Protein
+from xlranker.bio.pairs import ProteinPair
+from xlranker.ml.features import FeatureBuilder, TrainingBuffer
+
+PROTEINS = [
+    Protein("A", "A", {"x": 1.0, "y": None}),
+    Protein("B", "B", {"x": 2.0, "y": 5.0}),
+    Protein("C", "C", {"x": None, "y": None}),
+]
+
+
+def test_features_match_abundance_dict():
+    builder = FeatureBuilder(PROTEINS, ["x", "y"])
+    pairs = [
+        ProteinPair(a, b) for i, a in enumerate(PROTEINS) for b in PROTEINS[i + 1 :]
+    ]
+    features = builder.build_from_pairs(pairs, dtype=np.float64)
+    expected = np.array(
+        [
+            [np.nan if value is None else value for value in values]
+            for values in (list(pair.abundance_dict().values())[1:] for pair in pairs)
+        ],
+        dtype=np.float64,
+    )
+    assert builder.feature_names == ["x_a", "x_b", "y_a", "y_b"]
+    np.testing.assert_array_equal(features, expected)
+
+
+def test_training_buffer_keeps_positive_block():
+    builder = FeatureBuilder(PROTEINS, ["x", "y"])
+    positive_X = builder.build_from_pairs([ProteinPair(PROTEINS[0], PROTEINS[1])])
+    buffer = TrainingBuffer(positive_X, max_negatives=2)
+    for negatives in ([1], [0, 1]):
+        a = np.full(len(negatives), 2)
+        X, y = buffer.with_negatives(builder, a, np.array(negatives))
+        np.testing.assert_array_equal(
+            X, np.vstack([positive_X, builder.build(a, np.array(negatives))])
+        )
+        np.testing.assert_array_equal(y, [1.0] + [0.0] * len(negatives))
@@ -0,0 +1,29 @@
+import numpy as np
+
+from xlranker.data import read_gene_set_db, write_gene_set_db
+from xlranker.ml.models import in_same_set
+from xlranker.util.gene_sets import GeneSetIndex
+
+GMTS = [[{"A", "B"}, {"C"}], [{"B", "C", "D"}]]
+
+
+def test_gene_set_index_matches_in_same_set():
+    index = GeneSetIndex.from_gmts(GMTS)
+    genes = ["A", "B", "C", "D", "E"]
+    pairs = [(a, b) for a in genes for b in genes if a != b]
+    expected = [in_same_set(a, b, GMTS) for a, b in pairs]
+    assert [index.share_set(a, b) for a, b in pairs] == expected
+    assert (
+        index.share_set_pairs([a for a, _ in pairs], [b for _, b in pairs]).tolist()
+        == expected
+    )
+
+
+def test_compact_gene_set_db_round_trip(tmp_path):
+    gmts = [[{"A", "B"}, {"C"}], [{"B", "Ä"}]]
+    write_gene_set_db(gmts, tmp_path)
+    index = read_gene_set_db(tmp_path)
+    expected = GeneSetIndex.from_gmts(gmts)
+    assert index.genes == expected.genes
+    np.testing.assert_array_equal(index.bits, expected.bits)
+    assert index.share_set("B", "Ä") and not index.share_set("A", "C")
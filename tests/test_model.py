@@ -0,0 +1,200 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from xlranker.bio import Peptide
+from xlranker.bio.pairs import PeptidePair
+from xlranker.config import config
+from xlranker.lib import XLDataSet
+from xlranker.ml.backends import XGBoostBackend
+from xlranker.ml.models import DEFAULT_XGB_PARAMS, ModelConfig, PrioritizationModel
+from xlranker.ml.sampling import NegativePool
+from xlranker.parsimony import ParsimonySelector
+from xlranker.util import get_pair_id, set_seed
+
+PROTEINS = [f"P{i:02d}" for i in range(60)]
+XGB_PARAMS = DEFAULT_XGB_PARAMS | {"n_estimators": 8, "max_depth": 3}
+
+
+def make_data_set() -> XLDataSet:
+    rng = np.random.default_rng(0)
+    omic_data = {
+        name: pl.DataFrame({"gene": PROTEINS, "value": rng.normal(size=len(PROTEINS))})
+        for name in ("proteome", "phospho")
+    }
+    network: dict[str, PeptidePair] = {}
+    for i in range(40):  # unambiguous pairs are the positives
+        a, b = rng.choice(len(PROTEINS), size=2, replace=False)
+        add_peptide_pair(network, f"A{i}", [PROTEINS[a]], f"B{i}", [PROTEINS[b]])
+    for i in range(12):  # the second peptide maps to two proteins, so both pairs tie
+        a, b, c = rng.choice(len(PROTEINS), size=3, replace=False)
+        add_peptide_pair(
+            network, f"C{i}", [PROTEINS[a]], f"D{i}", [PROTEINS[b], PROTEINS[c]]
+        )
+    data_set = XLDataSet(network, omic_data)
+    data_set.build_proteins()
+    ParsimonySelector(data_set).run()
+    return data_set
+
+
+def add_peptide_pair(network, seq_a, prot_a, seq_b, prot_b) -> None:
+    a = Peptide(seq_a, prot_a)
+    b = Peptide(seq_b, prot_b)
+    network[get_pair_id(a, b)] = PeptidePair(a, b)
+
+
+def run_model(**kwargs) -> PrioritizationModel:
+    set_seed(7)
+    model = PrioritizationModel(
+        make_data_set(),
+        ModelConfig(**({"runs": 3, "folds": 3, "xgb_params": XGB_PARAMS} | kwargs)),
+        gmt_list=[],
+        ppi_db=pl.DataFrame({"P1": ["P00"], "P2": ["P01"]}),
+    )
+    model.run_model()
+    return model
+
+
+def scores(model: PrioritizationModel) -> np.ndarray:
+    return np.array([pair.score for pair in model.to_predict])
+
+
+@pytest.fixture(autouse=True)
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "output", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def plain():
+    return run_model(n_jobs=1)
+
+
+def test_plain_run(plain, output_dir):
+    assert len(plain.aucs) == 3
+    assert [len(models) for models in plain.run_models] == [1, 1, 1]
+    assert len(plain.positives) > 0 and len(plain.to_predict) > 0
+    assert (output_dir / "model_output.tsv").exists()
+    assert not (output_dir / "model").exists()
+
+
+def test_concurrent_runs_match_serial(plain):
+    model = run_model(n_jobs=2)
+    assert model.aucs == plain.aucs
+    np.testing.assert_array_equal(scores(model), scores(plain))
+
+
+def test_fold_ensemble_skips_final_fit(plain, monkeypatch):
+    fits = []
+    fit = XGBoostBackend.fit
+
+    def counted_fit(self, rows, seed):
+        fits.append(rows is None)
+        return fit(self, rows, seed)
+
+    monkeypatch.setattr(XGBoostBackend, "fit", counted_fit)
+    model = run_model(n_jobs=1, fold_ensemble=True)
+    assert len(fits) == 3 * 3 and not any(fits)
+    assert [len(models) for models in model.run_models] == [3, 3, 3]
+    assert model.aucs == plain.aucs  # the folds are unchanged
+
+
+def test_artifact_reproduces_scores(output_dir):
+    model = run_model(save_artifact=True)
+    loaded = PrioritizationModel.from_artifact(
+        output_dir / "model",
+        make_data_set(),
+        gmt_list=[],
+        ppi_db=pl.DataFrame({"P1": ["P00"], "P2": ["P01"]}),
+    )
+    np.testing.assert_allclose(loaded.predict_pairs(), scores(model), rtol=1e-6)
+
+
+def test_disjoint_negative_pool(monkeypatch):
+    rows: dict[int, np.ndarray] = {}
+    run_indices = NegativePool.run_indices
+
+    def recorded_run_indices(self, run, rng):
+        rows[run] = run_indices(self, run, rng)
+        return rows[run]
+
+    monkeypatch.setattr(NegativePool, "run_indices", recorded_run_indices)
+    model = run_model(negative_pool="disjoint")
+    assert sorted(rows) == [0, 1, 2]
+    used = np.concatenate(list(rows.values()))
+    assert len(used) == 3 * len(model.positives)
+    assert len(np.unique(used)) == len(used)
+
+
+def test_convergence_stops_early():
+    model = run_model(runs=6, convergence_tolerance=1.0, convergence_patience=1)
+    assert len(model.aucs) == 2
+    assert len(model.run_models) == 2
+
+
+def test_memory_limit_matches_in_memory(monkeypatch):
+    in_memory = run_model(backend="xgboost-native")
+    # small batches, so training and prediction go through several of them
+    monkeypatch.setattr(PrioritizationModel, "batch_rows", lambda self: 16)
+    external = run_model(backend="xgboost-native", memory_limit=1)
+    # fold matrices get their own quantile bins, so the AUCs only agree roughly
+    assert external.aucs == pytest.approx(in_memory.aucs, abs=0.05)
+    np.testing.assert_allclose(scores(external), scores(in_memory), atol=1e-6)
+
+
+def test_warm_start_adds_rounds(output_dir):
+    run_model(save_artifact=True)
+    model = run_model(warm_start=str(output_dir / "model"), warm_start_rounds=3)
+    assert len(model.run_models) == 3
+    for models in model.run_models:
+        assert [m.num_boosted_rounds() for m in models] == [8 + 3]
+    model.save_model(str(output_dir / "warm"))
+    loaded = PrioritizationModel.from_artifact(
+        output_dir / "warm",
+        make_data_set(),
+        gmt_list=[],
+        ppi_db=pl.DataFrame({"P1": ["P00"], "P2": ["P01"]}),
+    )
+    assert loaded.model_config.warm_start is None
+    assert not loaded.model_config.save_artifact
+
+
+def test_tune_updates_xgb_params(plain):
+    result = plain.tune(
+        time_budget=60,
+        param_grid={"max_depth": [2, 3], "eta": [0.1, 0.3]},
+        min_rounds=2,
+        max_rounds=6,
+        reduction_factor=2,
+    )
+    assert result.completed
+    assert plain.model_config.xgb_params == result.params
+    assert result.params["n_estimators"] in (2, 4, 6)
+    assert result.params["objective"] == "binary:logistic"
+
+
+def test_negative_pool_respects_fragile(plain, monkeypatch):
+    monkeypatch.setattr(plain.negative_sampler, "max_pairs", lambda: 1)
+    monkeypatch.setattr(config, "fragile", True)
+    with pytest.raises(ValueError):
+        plain.build_negative_pool("disjoint", 0)
+    monkeypatch.setattr(config, "fragile", False)
+    pool = plain.build_negative_pool("subsample", 0)
+    assert len(pool) == 1 and pool.run_size == 1
+
+
+def test_warm_start_ignores_convergence(output_dir, caplog):
+    run_model(save_artifact=True)
+    model = run_model(
+        warm_start=str(output_dir / "model"),
+        convergence_tolerance=1.0,
+        convergence_patience=1,
+    )
+    assert len(model.run_models) == 3
+    assert "not used with a warm start" in caplog.text
+
+
+def test_memory_limit_rejects_attribution():
+    assert not ModelConfig(attribution=True, memory_limit=1).validate()
+    with pytest.raises(ValueError):
+        run_model(backend="xgboost-native", attribution=True, memory_limit=1)
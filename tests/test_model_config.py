@@ -0,0 +1,23 @@
+from xlranker.ml.backends import booster_params
+from xlranker.ml.models import ModelConfig
+
+
+def test_thread_plan_splits_budget():
+    assert ModelConfig(runs=10).thread_plan() == (1, None)
+    assert ModelConfig(runs=10, n_jobs=8).thread_plan() == (8, 1)
+    assert ModelConfig(runs=2, n_jobs=8).thread_plan() == (2, 4)
+    assert ModelConfig(runs=3, n_jobs=1).thread_plan() == (1, 1)
+
+
+def test_validate_n_jobs():
+    assert ModelConfig(n_jobs=-1).validate()
+    assert not ModelConfig(n_jobs=0).validate()
+
+
+def test_booster_params_converts_classifier_params():
+    params, rounds = booster_params(
+        {"n_estimators": 50, "n_jobs": 2, "max_depth": 3}, seed=7
+    )
+    assert rounds == 50
+    assert params == {"max_depth": 3, "seed": 7, "nthread": 2}
+    assert booster_params({}, seed=1)[1] == 100
@@ -0,0 +1,144 @@
+import json
+
+import polars as pl
+
+from xlranker.bio import Peptide
+from xlranker.bio.pairs import PeptidePair
+from xlranker.config import config
+from xlranker.lib import XLDataSet
+from xlranker.parsimony import ParsimonyCache, ParsimonySelector
+from xlranker.status import PrioritizationStatus
+from xlranker.util import get_pair_id
+
+OMIC_DATA = {
+    "omic": pl.DataFrame(
+        {
+            "gene": ["P1", "P2", "P3", "P4", "P5", "P6"],
+            "value": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+}
+
+
+def make_network(edges: list[tuple[str, list[str], str, list[str]]]):
+    network: dict[str, PeptidePair] = {}
+    for seq_a, prot_a, seq_b, prot_b in edges:
+        a = Peptide(seq_a, prot_a)
+        b = Peptide(seq_b, prot_b)
+        network[get_pair_id(a, b)] = PeptidePair(a, b)
+    return network
+
+
+BASE_EDGES = [
+    ("AAA", ["P1"], "BBB", ["P2"]),
+    ("AAA", ["P1"], "CCC", ["P2", "P3"]),
+    ("DDD", ["P4"], "EEE", ["P5"]),
+]
+
+
+def statuses(data_set: XLDataSet) -> dict[str, PrioritizationStatus]:
+    return {
+        key: pair.prioritization_status for key, pair in data_set.protein_pairs.items()
+    }
+
+
+def full_run(edges) -> XLDataSet:
+    data_set = XLDataSet(make_network(edges), OMIC_DATA)
+    data_set.build_proteins()
+    ParsimonySelector(data_set).run()
+    return data_set
+
+
+def test_update_added_matches_full_run():
+    new_edge = ("DDD", ["P4"], "FFF", ["P5", "P6"])
+    data_set = XLDataSet(make_network(BASE_EDGES), OMIC_DATA)
+    data_set.build_proteins()
+    selector = ParsimonySelector(data_set)
+    selector.run()
+    untouched = data_set.protein_pairs["P1+P2"]
+    untouched_group = untouched.group_id
+    new_groups = selector.update(added=make_network([new_edge]))
+    assert len(new_groups) == 1
+    assert untouched.group_id == untouched_group
+    assert untouched.prioritization_status == (
+        PrioritizationStatus.PARSIMONY_PRIMARY_SELECTED
+    )
+    assert statuses(data_set) == statuses(full_run(BASE_EDGES + [new_edge]))
+
+
+def test_update_removed_matches_full_run():
+    data_set = XLDataSet(make_network(BASE_EDGES), OMIC_DATA)
+    data_set.build_proteins()
+    selector = ParsimonySelector(data_set)
+    selector.run()
+    selector.update(removed=["AAA+BBB"])
+    assert "P3" in data_set.proteins
+    assert statuses(data_set) == statuses(full_run(BASE_EDGES[1:]))
+    selector.update(removed=["AAA+CCC"])
+    assert "P1+P2" not in data_set.protein_pairs
+    assert "P1" not in data_set.proteins
+    assert statuses(data_set) == statuses(full_run(BASE_EDGES[2:]))
+
+
+def test_update_tracks_protein_references():
+    data_set = XLDataSet(make_network(BASE_EDGES), OMIC_DATA)
+    data_set.build_proteins()
+    selector = ParsimonySelector(data_set)
+    selector.run()
+    assert data_set.protein_references["P2"] == 2
+    selector.update(
+        added=make_network([("FFF", ["P6"], "GGG", ["P4", "P6"])]), remove_intra=True
+    )
+    assert "P6" not in data_set.proteins
+    selector.update(removed=["DDD+EEE"])
+    assert "P4" not in data_set.proteins
+    assert "P4" not in data_set.protein_references
+
+
+def test_cache_reuses_identical_groups():
+    cache = ParsimonyCache()
+    first = XLDataSet(make_network(BASE_EDGES), OMIC_DATA)
+    first.build_proteins()
+    ParsimonySelector(first, cache=cache, seed=7).run()
+    assert cache.hits == 0
+    assert len(cache) == 2
+    second = XLDataSet(make_network(BASE_EDGES), OMIC_DATA)
+    second.build_proteins()
+    ParsimonySelector(second, cache=cache, seed=7).run()
+    assert cache.hits == 2
+    assert statuses(first) == statuses(second)
+    third = XLDataSet(make_network(BASE_EDGES), OMIC_DATA)
+    third.build_proteins()
+    ParsimonySelector(third, cache=cache, seed=8).run()
+    assert cache.hits == 2
+    assert len(cache) == 4
+
+
+def test_instrumented_stats(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "output", str(tmp_path))
+    data_set = XLDataSet(make_network(BASE_EDGES), OMIC_DATA)
+    data_set.build_proteins()
+    selector = ParsimonySelector(data_set, instrument=True)
+    selector.run()
+    groups = pl.read_csv(tmp_path / "parsimony_groups.tsv", separator="\t")
+    assert groups.select(
+        "group", "peptide_pairs", "protein_pairs", "greedy_iterations"
+    ).rows() == [(1, 2, 2, 1), (2, 1, 1, 1)]
+    with open(tmp_path / "parsimony_stats.json") as r:
+        stats = json.load(r)
+    assert stats["n_groups"] == 2
+    assert stats["greedy_iterations"] == 2
+    assert stats["cached_groups"] == 0
+    assert stats["protein_pairs_histogram"] == {"1": 1, "2": 1}
+    assert stats["largest_group"] == {
+        "group": 1,
+        "peptide_pairs": 2,
+        "protein_pairs": 2,
+    }
+    # update replaces the stats of the regrouped group and writes the files again
+    selector.update(added=make_network([("DDD", ["P4"], "FFF", ["P5", "P6"])]))
+    groups = pl.read_csv(tmp_path / "parsimony_groups.tsv", separator="\t")
+    assert groups.select("group", "peptide_pairs", "protein_pairs").rows() == [
+        (1, 2, 2),
+        (3, 2, 2),
+    ]
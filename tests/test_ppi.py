@@ -0,0 +1,34 @@
+import polars as pl
+
+from xlranker.data import read_ppi_index, write_ppi_db
+from xlranker.util.ppi import PPIIndex
+
+PPI_DB = pl.DataFrame({"P1": ["A", "A", "B", None], "P2": ["B", "C", "D", "E"]})
+
+
+def test_ppi_index_is_symmetric():
+    index = PPIIndex.from_dataframe(PPI_DB)
+    assert len(index) == 3
+    assert index.contains("A", "B")
+    assert index.contains("B", "A")
+    assert index.contains("D", "B")
+    assert not index.contains("A", "D")
+
+
+def test_ppi_index_unknown_proteins():
+    index = PPIIndex.from_dataframe(PPI_DB)
+    assert index.contains_pairs(["A", "X", "E"], ["C", "A", "A"]).tolist() == [
+        True,
+        False,
+        False,
+    ]
+
+
+def test_integer_encoded_ppi_round_trip(tmp_path):
+    ppi_db = pl.DataFrame({"P1": ["a", "B", "C"], "P2": ["b", "C", "a"]})
+    write_ppi_db(ppi_db, tmp_path)
+    index = read_ppi_index(tmp_path)
+    assert index.proteins == ["A", "B", "C"]
+    assert len(index) == 3
+    assert index.contains("B", "A") and index.contains("A", "C")
+    assert not index.contains("a", "b")
@@ -0,0 +1,43 @@
+import numpy as np
+
+from xlranker.ml.sampling import NegativePool, NegativeSampler
+from xlranker.util.gene_sets import GeneSetIndex
+
+PROTEINS = [f"P{i}" for i in range(12)]
+EXISTING = [("P0", "P1"), ("P3", "P2")]
+GMTS = [[{"P4", "P5", "P6"}]]
+
+
+def make_sampler() -> NegativeSampler:
+    return NegativeSampler(PROTEINS, EXISTING, GeneSetIndex.from_gmts(GMTS))
+
+
+def test_negatives_are_valid_and_reproducible():
+    sampler = make_sampler()
+    a, b = sampler.sample(40, np.random.default_rng(3))
+    pairs = {tuple(sorted((PROTEINS[i], PROTEINS[j]))) for i, j in zip(a, b)}
+    assert len(pairs) == 40
+    assert pairs.isdisjoint({("P0", "P1"), ("P2", "P3")})
+    assert pairs.isdisjoint({("P4", "P5"), ("P4", "P6"), ("P5", "P6")})
+    a2, b2 = make_sampler().sample(40, np.random.default_rng(3))
+    assert a.tolist() == a2.tolist() and b.tolist() == b2.tolist()
+
+
+def test_negatives_capped_by_valid_pairs():
+    sampler = make_sampler()
+    n_valid = 12 * 11 // 2 - 2 - 3
+    assert len(sampler.enumerate_valid()) == n_valid
+    a, _ = sampler.sample(n_valid + 5, np.random.default_rng(0))
+    assert len(a) == n_valid
+
+
+def test_negative_pool_modes():
+    features = np.arange(10, dtype=np.float32).reshape(10, 1)
+    pool = NegativePool(features, "disjoint", runs=3, run_size=3)
+    rows = [pool.run_indices(run, np.random.default_rng(run)) for run in range(3)]
+    assert len(set(np.concatenate(rows).tolist())) == 9
+    small_pool = NegativePool(features, "disjoint", runs=4, run_size=3)
+    assert not small_pool.is_disjoint
+    subsample = NegativePool(features, "subsample", runs=2, run_size=20)
+    rows = subsample.run_indices(0, np.random.default_rng(0))
+    assert len(rows) == 10 and len(set(rows.tolist())) == 10
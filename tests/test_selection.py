@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from xlranker.bio import Protein
+from xlranker.bio.pairs import PairRegistry, ProteinPair
+from xlranker.selection import ThresholdSelector
+from xlranker.status import PrioritizationStatus, ReportStatus
+
+PROTEINS = [Protein(f"P{i}", f"P{i}", {"omic": float(i)}) for i in range(10)]
+SCORES = [-1.0, 0.3, 0.5, 0.7, 0.9, 1.0, 1.01, 1.02]
+
+
+def random_pairs(seed: int) -> list[ProteinPair]:
+    rng = random.Random(seed)
+    pairs: dict[str, ProteinPair] = {}
+    for _ in range(40):
+        pair = ProteinPair(rng.choice(PROTEINS), rng.choice(PROTEINS))
+        if pair.pair_id in pairs:
+            continue
+        for peptide in rng.sample(range(4), rng.randint(1, 2)):
+            pair.add_connection(f"pep{peptide}")
+        pair.set_score(rng.choice(SCORES))
+        pair.set_prioritization_status(rng.choice(list(PrioritizationStatus)))
+        pair.set_report_status(rng.choice(list(ReportStatus)))
+        pairs[pair.pair_id] = pair
+    return list(pairs.values())
+
+
+def test_registry_follows_selection():
+    for seed in range(20):
+        pairs = random_pairs(seed)
+        registry = PairRegistry()
+        for pair in pairs:
+            registry.add(pair)
+        registry.remove(pairs.pop(3))
+        ThresholdSelector(0.4, top_n=2).process(pairs)
+        assert len(registry) == len(pairs)
+        for status in PrioritizationStatus:
+            assert registry.with_status(status) == [
+                pair for pair in pairs if pair.prioritization_status == status
+            ]
+        for status in ReportStatus:
+            assert registry.with_report_status_at_most(status) == [
+                pair for pair in pairs if pair.report_status <= status
+            ]
+
+
+@pytest.mark.parametrize(
+    "top_n, expected",
+    [
+        (3, ["P0+P9", "P1+P5"]),  # top_n - 1 candidates are selected
+        (4, ["P0+P9", "P1+P5", "P2+P3"]),
+        (5, ["P0+P9", "P1+P5", "P2+P3", "P4+P6"]),  # fewer than top_n, all selected
+    ],
+)
+def test_threshold_top_n_tie_breaking(top_n, expected):
+    scores = {
+        ("P0", "P1"): 0.95,
+        ("P4", "P6"): 0.8,
+        ("P2", "P3"): 0.8,
+        ("P0", "P9"): 0.9,
+        ("P1", "P5"): 0.8,
+        ("P7", "P8"): 0.2,
+    }
+    proteins = {protein.name: protein for protein in PROTEINS}
+    pairs = []
+    for (a, b), score in scores.items():
+        pair = ProteinPair(proteins[a], proteins[b])
+        pair.add_connection("pep0")
+        pair.set_score(score)
+        pair.set_prioritization_status(PrioritizationStatus.PARSIMONY_AMBIGUOUS)
+        pairs.append(pair)
+    ThresholdSelector(0.5, top_n=top_n).process(pairs)
+    secondary = sorted(
+        pair.pair_id
+        for pair in pairs
+        if pair.prioritization_status == PrioritizationStatus.ML_SECONDARY_SELECTED
+    )
+    assert secondary == expected
+    assert pairs[0].prioritization_status == PrioritizationStatus.ML_PRIMARY_SELECTED
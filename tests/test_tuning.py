@@ -0,0 +1,45 @@
+import math
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+
+from xlranker.ml.tuning import SuccessiveHalving, expand_grid
+
+GRID = {"max_depth": [1, 2, 3], "eta": [0.1, 0.3, 0.5]}
+
+
+def make_search() -> SuccessiveHalving:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4)).astype(np.float32)
+    y = (X[:, 0] * X[:, 1] > 0).astype(float)
+    folds = list(StratifiedKFold(3, shuffle=True, random_state=0).split(X, y))
+    return SuccessiveHalving(X, y, folds, {"objective": "binary:logistic"}, seed=1)
+
+
+def test_successive_halving_keeps_best_third():
+    candidates = expand_grid(GRID)
+    result = make_search().run(candidates, time_budget=60, min_rounds=5, max_rounds=45)
+    assert result.completed
+    assert [entry["rounds"] for entry in result.history] == [5] * 9 + [15] * 3 + [45]
+    survivor = {key: result.history[-1][key] for key in GRID}
+    assert {key: result.params[key] for key in GRID} == survivor
+    # the last candidate trains to max_rounds, its best round count is kept
+    best = max(
+        (
+            e
+            for e in result.history
+            if e["rounds"] >= 15 and {key: e[key] for key in GRID} == survivor
+        ),
+        key=lambda e: e["auc"],
+    )
+    assert result.params["n_estimators"] == best["rounds"]
+    assert result.score == best["auc"]
+
+
+def test_exhausted_budget_keeps_base_params():
+    search = make_search()
+    search.base_params["n_estimators"] = 80
+    result = search.run(expand_grid(GRID), time_budget=0)
+    assert not result.completed
+    assert math.isnan(result.score)
+    assert result.params == {"objective": "binary:logistic", "n_estimators": 80}